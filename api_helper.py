@@ -4,10 +4,82 @@ API Helper - Funciones para integración con FastAPI Backend
 Convierte toda la salida del parser a formato JSON para el frontend
 """
 
-from lr1_parser import Grammar, LR1Parser
+from lr1_parser import BuildLimitExceeded, BuildLimits, Grammar, LR1Parser, TableCache
+from lr1_parser.compressed import compression_report
+from lr1_parser.render import RenderPool, RenderPoolSaturated, RenderTimeout, get_render_pool, set_render_pool
+from parser_cache import ParserCache, huella_gramatica
+from grammar_registry import GrammarRegistry
+from process_pool import ProcessPool
+import asyncio
 import json
 import base64
 import os
+import threading
+
+
+# Límites de cada construcción: una gramática patológica se aborta con
+# BuildLimitExceeded en lugar de agotar la memoria del contenedor (0 sin límite)
+_LIMITES_CONSTRUCCION = BuildLimits(
+    max_states=int(os.getenv("LR1_BUILD_MAX_STATES", 20000)) or None,
+    max_items=int(os.getenv("LR1_BUILD_MAX_ITEMS", 2000000)) or None,
+    max_seconds=float(os.getenv("LR1_BUILD_MAX_SECONDS", 30)) or None,
+    max_memory_mb=int(os.getenv("LR1_BUILD_MAX_MB", 1024)) or None,
+)
+
+# Caché de parsers construidos, compartida por todos los endpoints del proceso.
+# Es la única: los procesos del pool no guardan parsers, reciben los de esta
+# caché ya compilados (ver ejecutar_con_parser).
+# Una gramática que supera los límites se recuerda LR1_BUILD_FAILURE_TTL
+# segundos: repetirla responde el mismo error sin volver a gastar el presupuesto
+_cache_parsers = ParserCache(
+    max_entries=int(os.getenv("LR1_CACHE_MAX_ENTRIES", 128)),
+    max_bytes=int(os.getenv("LR1_CACHE_MAX_MB", 256)) * 1024 * 1024,
+    failure_ttl=float(os.getenv("LR1_BUILD_FAILURE_TTL", 60)),
+    failure_types=(BuildLimitExceeded,),
+    failure_scope=repr(_LIMITES_CONSTRUCCION),
+)
+
+# Caché persistente en disco (opcional): sobrevive a reinicios, y los workers
+# que apuntan al mismo directorio parsean sobre una única copia mapeada de las tablas
+_cache_disco = TableCache(os.environ["LR1_DISK_CACHE_DIR"]) if os.getenv("LR1_DISK_CACHE_DIR") else None
+
+# Caché de gráficos renderizados (misma LRU acotada que la de parsers):
+# huella del autómata + variante + formato -> bytes de la imagen
+_cache_graficos = ParserCache(
+    max_entries=int(os.getenv("LR1_RENDER_CACHE_MAX_ENTRIES", 256)),
+    max_bytes=int(os.getenv("LR1_RENDER_CACHE_MAX_MB", 64)) * 1024 * 1024,
+)
+
+# Procesos de Graphviz: LR1_RENDER_WORKERS renders a la vez, LR1_RENDER_QUEUE
+# en espera (más allá se rechazan) y LR1_RENDER_TIMEOUT segundos por render
+set_render_pool(RenderPool(
+    max_workers=int(os.getenv("LR1_RENDER_WORKERS", 2)),
+    max_queue=int(os.getenv("LR1_RENDER_QUEUE", 8)),
+    timeout=float(os.getenv("LR1_RENDER_TIMEOUT", 30)) or None,
+))
+
+# Registro de gramáticas compiladas, consultadas por id en /grammars/{id}/...
+_registro_gramaticas = GrammarRegistry(
+    max_entries=int(os.getenv("LR1_REGISTRY_MAX_ENTRIES", 256)),
+    idle_seconds=int(os.getenv("LR1_REGISTRY_IDLE_SECONDS", 3600)),
+)
+
+# Pool de procesos para la construcción y el parsing de los endpoints
+# asíncronos (con LR1_PROCESS_WORKERS=0 se ejecutan en hilos del propio
+# proceso) y tiempo máximo por tarea (LR1_REQUEST_TIMEOUT segundos, 0 sin límite)
+_PROCESOS = int(os.getenv("LR1_PROCESS_WORKERS", os.cpu_count() or 1))
+_TIMEOUT_TAREA = float(os.getenv("LR1_REQUEST_TIMEOUT", 60))
+_pool_procesos = None
+_lock_pool = threading.Lock()
+
+# Parsing por lotes: a partir de LR1_BATCH_PARALLEL_MIN entradas el lote se
+# reparte en LR1_BATCH_WORKERS bloques entre los procesos del pool (1 desactiva el reparto)
+_LOTE_PARALELO_MIN = int(os.getenv("LR1_BATCH_PARALLEL_MIN", 256))
+_LOTE_PROCESOS = int(os.getenv("LR1_BATCH_WORKERS", max(_PROCESOS, 1)))
+
+
+class GramaticaInvalida(ValueError):
+    """La gramática no se pudo parsear (formato inválido)."""
 
 
 def parsear_gramatica_desde_texto_interno(texto):
@@ -56,22 +128,86 @@ def parsear_gramatica_desde_texto_interno(texto):
     return grammar
 
 
-def parsear_gramatica(texto_gramatica):
-    """Parsea una gramática desde texto y construye el parser."""
+def parsear_gramatica(texto_gramatica, mode="lr1"):
+    """
+    Parsea una gramática desde texto y construye el parser.
+
+    Los parsers construidos se guardan (congelados) en una caché LRU, así que
+    varias llamadas con la misma gramática y modo comparten el mismo objeto.
+
+    Args:
+        texto_gramatica: Texto de la gramática
+        mode: Modo de construcción del autómata ("lr1", "lalr" o "pager")
+    
+    Raises:
+        BuildLimitExceeded si la construcción supera los límites LR1_BUILD_*
+    """
+    return _cache_parsers.get_or_build(texto_gramatica, _construir_parser, mode)
+
+
+def _construir_parser(texto_gramatica, mode="lr1"):
+    """Construye la gramática y el parser LR(1) sin pasar por la caché."""
     try:
         grammar = parsear_gramatica_desde_texto_interno(texto_gramatica)
         if grammar is None:
             return None, None
         
-        parser = LR1Parser(grammar)
-        parser.build()
+        parser = LR1Parser(grammar, mode=mode)
+        if _cache_disco is None:
+            parser.build(_LIMITES_CONSTRUCCION)
+        else:
+            clave = huella_gramatica(texto_gramatica, mode)
+            if not _cache_disco.load(clave, parser):
+                parser.build(_LIMITES_CONSTRUCCION)
+                _cache_disco.share(clave, parser)
         
         return grammar, parser
+    except BuildLimitExceeded:
+        # No es un error de formato: el llamador lo distingue (422 en la API)
+        raise
     except Exception as e:
         print(f"Error al parsear gramática: {e}")
         return None, None
 
 
+def obtener_estadisticas_cache():
+    """
+    Retorna las estadísticas de la caché de parsers (y de la caché en disco,
+    si está activa, y del registro de gramáticas).
+    """
+    estadisticas = _cache_parsers.stats()
+    estadisticas["disk"] = _cache_disco.stats() if _cache_disco is not None else None
+    estadisticas["registry"] = _registro_gramaticas.stats()
+    estadisticas["renders"] = _cache_graficos.stats()
+    estadisticas["render_pool"] = get_render_pool().stats()
+    estadisticas["process_pool"] = _pool_procesos.stats() if _pool_procesos is not None else None
+    return estadisticas
+
+
+def registrar_gramatica(texto_gramatica, mode="lr1"):
+    """
+    Compila una gramática y la guarda en el registro.
+
+    Returns:
+        El id (estable: depende solo del contenido y del modo), o None si la
+        gramática no se pudo compilar
+    """
+    return _registro_gramaticas.register(texto_gramatica, mode, parsear_gramatica)
+
+
+def obtener_gramatica_registrada(grammar_id):
+    """
+    Retorna la entrada de un id registrado (dict con text, grammar, parser y
+    mode), o None si no está registrado o se expulsó por inactividad.
+    """
+    return _registro_gramaticas.get(grammar_id)
+
+
+def eliminar_gramatica_registrada(grammar_id):
+    """Elimina una gramática del registro; retorna si estaba registrada."""
+    return _registro_gramaticas.remove(grammar_id)
+
+
 def obtener_producciones_json(grammar):
     """Convierte las producciones a formato JSON."""
     producciones = []
@@ -158,6 +294,7 @@ def obtener_automata_json(parser):
         })
     
     return {
+        "mode": parser.mode,
         "num_states": len(parser.states),
         "states": states_info,
         "transitions": transitions
@@ -232,6 +369,17 @@ def obtener_tabla_parsing_json(grammar, parser):
     }
 
 
+def obtener_tabla_comprimida_json(parser):
+    """
+    Retorna la tabla de parsing comprimida (arrays de enteros) junto con las
+    estadísticas de compresión y latencia de consulta frente a las otras formas.
+    """
+    return {
+        "tables": parser.compressed_tables.to_json(),
+        "stats": compression_report(parser),
+    }
+
+
 def obtener_tabla_clausura_json(parser):
     """Convierte la tabla de clausura a formato JSON (mejorado para frontend)."""
     clausuras = []
@@ -316,63 +464,138 @@ def obtener_tabla_clausura_json(parser):
     return clausuras
 
 
-def generar_graficos_base64(parser, filename_prefix="automaton_api"):
-    """Genera los gráficos del autómata LR(1) y los convierte a base64."""
-    import traceback
+# Variantes de gráfico del autómata: nombre -> métodos de LR1Parser
+# (<base>_graph, <base>_graph_data y render_<base>)
+VARIANTES_GRAFICO = {
+    "afd": "automaton",
+    "afn": "simplified_automaton",
+}
+
+
+def grafo_dot(parser, variante):
+    """Código DOT de una variante del autómata ("afd" o "afn"), sin ejecutar Graphviz."""
+    return getattr(parser, f"{VARIANTES_GRAFICO[variante]}_graph")().source
+
+
+def grafo_json(parser, variante):
+    """Grafo {"nodes": [...], "edges": [...]} de una variante del autómata."""
+    return getattr(parser, f"{VARIANTES_GRAFICO[variante]}_graph_data")()
+
+
+def grafo_dot_stream(parser, variante):
+    """Versión en streaming de grafo_dot: genera el código DOT en bloques de líneas."""
+    bloque = []
+    for linea in getattr(parser, f"{VARIANTES_GRAFICO[variante]}_graph")():
+        bloque.append(linea)
+        if len(bloque) == _LINEAS_POR_BLOQUE:
+            yield "".join(bloque)
+            bloque = []
+    if bloque:
+        yield "".join(bloque)
+
+
+def grafo_ndjson(parser, variante):
+    """
+    Versión en streaming de grafo_json (NDJSON): la primera línea es
+    {"type": "graph", ...} con el número de nodos y aristas, y le siguen una
+    línea {"type": "node", ...} por nodo y {"type": "edge", ...} por arista.
+    """
+    datos = grafo_json(parser, variante)
+    yield json.dumps({
+        "type": "graph",
+        "variant": variante,
+        "num_nodes": len(datos["nodes"]),
+        "num_edges": len(datos["edges"]),
+    }, ensure_ascii=False) + "\n"
     
+    bloque = []
+    for tipo, elementos in (("node", datos["nodes"]), ("edge", datos["edges"])):
+        for elemento in elementos:
+            bloque.append(json.dumps({"type": tipo, **elemento}, ensure_ascii=False))
+            if len(bloque) == _LINEAS_POR_BLOQUE:
+                yield "\n".join(bloque) + "\n"
+                bloque = []
+    if bloque:
+        yield "\n".join(bloque) + "\n"
+
+
+def renderizar_grafico(parser, variante, formato="png"):
+    """
+    Renderiza una variante del autómata ("afd" o "afn") y retorna los bytes de
+    la imagen. Los renders se cachean por huella del autómata, variante y
+    formato, así que repetir la petición no vuelve a ejecutar Graphviz.
+    """
+    clave = f"{parser.fingerprint()}:{variante}:{formato}"
+    imagen = _cache_graficos.get(clave)
+    if imagen is None:
+        imagen = getattr(parser, f"render_{VARIANTES_GRAFICO[variante]}")(formato)
+        _cache_graficos.put(clave, imagen, len(imagen))
+    return imagen
+
+
+def generar_graficos_base64(parser, formato="png"):
+    """
+    Genera los gráficos del autómata LR(1) y los convierte a base64.
+
+    Las imágenes se renderizan en memoria (sin archivos temporales), así que
+    varias peticiones pueden generarlas a la vez, y se cachean (ver renderizar_grafico).
+
+    Args:
+        parser: LR1Parser construido
+        formato: "png" o "svg"
+    """
     resultado = {
-        "automaton_afn": None,  # AFD = solo kernel
-        "automaton_afd": None   # AFN = clausura completa
+        "automaton_afn": None,  # AFD: items agrupados por estado
+        "automaton_afd": None,  # AFN: transiciones item a item
+        "format": formato
     }
     
     try:
-        # AFD - Autómata con solo items kernel
-        afn_path = f"{filename_prefix}_afn"
-        print(f"[DEBUG] Generando AFD en: {afn_path}")
-        parser.visualize_automaton(afn_path)
-        
-        expected_file = f"{afn_path}.png"
-        print(f"[DEBUG] Buscando archivo: {expected_file}")
-        print(f"[DEBUG] Existe: {os.path.exists(expected_file)}")
-        
-        if os.path.exists(expected_file):
-            with open(expected_file, "rb") as f:
-                data = f.read()
-                resultado["automaton_afn"] = base64.b64encode(data).decode('utf-8')
-                print(f"[DEBUG] AFD generado exitosamente, tamaño: {len(resultado['automaton_afn'])} chars")
-            os.remove(expected_file)
-        else:
-            print(f"[ERROR] No se encontró el archivo: {expected_file}")
+        resultado["automaton_afn"] = base64.b64encode(renderizar_grafico(parser, "afd", formato)).decode('utf-8')
+    except (RenderPoolSaturated, RenderTimeout):
+        raise
     except Exception as e:
         print(f"[ERROR] Error generando AFD: {e}")
-        traceback.print_exc()
     
     try:
-        # AFN - Autómata con clausura completa (todos los items)
-        afd_path = f"{filename_prefix}_afd"
-        print(f"[DEBUG] Generando AFN en: {afd_path}")
-        parser.visualize_simplified_automaton(afd_path)
-        
-        kernel_file = f"{afd_path}_kernel.png"
-        print(f"[DEBUG] Buscando archivo: {kernel_file}")
-        print(f"[DEBUG] Existe: {os.path.exists(kernel_file)}")
-        
-        if os.path.exists(kernel_file):
-            with open(kernel_file, "rb") as f:
-                data = f.read()
-                resultado["automaton_afd"] = base64.b64encode(data).decode('utf-8')
-                print(f"[DEBUG] AFN generado exitosamente, tamaño: {len(resultado['automaton_afd'])} chars")
-            os.remove(kernel_file)
-        else:
-            print(f"[ERROR] No se encontró el archivo: {kernel_file}")
+        resultado["automaton_afd"] = base64.b64encode(renderizar_grafico(parser, "afn", formato)).decode('utf-8')
+    except (RenderPoolSaturated, RenderTimeout):
+        raise
     except Exception as e:
         print(f"[ERROR] Error generando AFN: {e}")
-        traceback.print_exc()
     
     return resultado
 
 
-def procesar_gramatica_completo(texto_gramatica, generar_graficos=False):
+async def generar_graficos_async(parser, formato="png"):
+    """
+    Versión asíncrona de generar_graficos_base64. Se ejecuta en un hilo del
+    proceso principal: así todos los renders pasan por el mismo RenderPool y la
+    misma caché de gráficos, en lugar de uno por proceso de trabajo.
+    
+    Raises:
+        RenderPoolSaturated si el pool de render está lleno; RenderTimeout si
+        el render supera LR1_RENDER_TIMEOUT
+    """
+    return await asyncio.to_thread(generar_graficos_base64, parser, formato)
+
+
+def datos_gramatica_completos(grammar, parser):
+    """Toda la información de un parser ya construido (sin gráficos) en formato JSON."""
+    return {
+        "grammar": {
+            "productions": obtener_producciones_json(grammar),
+            "num_productions": len(grammar.productions)
+        },
+        "symbols": obtener_simbolos_json(grammar, parser),
+        "first_follow": obtener_first_follow_json(grammar, parser),
+        "automaton": obtener_automata_json(parser),
+        "parsing_table": obtener_tabla_parsing_json(grammar, parser),
+        "closure_table": obtener_tabla_clausura_json(parser)
+    }
+
+
+def procesar_gramatica_completo(texto_gramatica, generar_graficos=False, mode="lr1", formato_graficos="png"):
     """Procesa una gramática y retorna TODA la información en formato JSON."""
     resultado = {
         "success": False,
@@ -381,175 +604,298 @@ def procesar_gramatica_completo(texto_gramatica, generar_graficos=False):
     }
     
     try:
-        grammar, parser = parsear_gramatica(texto_gramatica)
+        grammar, parser = parsear_gramatica(texto_gramatica, mode=mode)
         
         if grammar is None or parser is None:
             resultado["error"] = "No se pudo parsear la gramática. Verifica el formato."
             return resultado
         
-        data = {
-            "grammar": {
-                "productions": obtener_producciones_json(grammar),
-                "num_productions": len(grammar.productions)
-            },
-            "symbols": obtener_simbolos_json(grammar, parser),
-            "first_follow": obtener_first_follow_json(grammar, parser),
-            "automaton": obtener_automata_json(parser),
-            "parsing_table": obtener_tabla_parsing_json(grammar, parser),
-            "closure_table": obtener_tabla_clausura_json(parser)
-        }
+        data = datos_gramatica_completos(grammar, parser)
         
         if generar_graficos:
-            data["graphs"] = generar_graficos_base64(parser)
+            data["graphs"] = generar_graficos_base64(parser, formato_graficos)
         
         resultado["success"] = True
         resultado["data"] = data
         
+    except BuildLimitExceeded:
+        raise
     except Exception as e:
         resultado["error"] = f"Error al procesar gramática: {str(e)}"
     
     return resultado
 
 
-def parsear_cadena(grammar, parser, input_string):
+# Vistas de una gramática compilada: nombre -> función (grammar, parser) -> JSON.
+# Las comparten los endpoints /parse/<vista> y /grammars/{id}/<vista>
+VISTAS = {
+    "productions": lambda grammar, parser: {
+        "productions": obtener_producciones_json(grammar),
+        "num_productions": len(grammar.productions)
+    },
+    "symbols": obtener_simbolos_json,
+    "first-follow": obtener_first_follow_json,
+    "automaton": lambda grammar, parser: obtener_automata_json(parser),
+    "table": obtener_tabla_parsing_json,
+    "table/compressed": lambda grammar, parser: obtener_tabla_comprimida_json(parser),
+    "closure": lambda grammar, parser: obtener_tabla_clausura_json(parser),
+    "graphs": lambda grammar, parser: generar_graficos_base64(parser),
+    "graphs/svg": lambda grammar, parser: generar_graficos_base64(parser, "svg"),
+    "graphs/dot": lambda grammar, parser: {variante: grafo_dot(parser, variante) for variante in VARIANTES_GRAFICO},
+    "graphs/json": lambda grammar, parser: {variante: grafo_json(parser, variante) for variante in VARIANTES_GRAFICO},
+}
+
+
+def calcular_vista(grammar, parser, vista):
+    """Calcula una vista de VISTAS (función de nivel de módulo: se puede enviar al pool)."""
+    return VISTAS[vista](grammar, parser)
+
+
+def _accion_comprimida(tablas, estado, token):
+    """Acción (tipo, valor) de las tablas comprimidas para un token por nombre, o None."""
+    terminal = tablas.symbol_ids.get(token, -1)
+    if not 0 <= terminal < tablas.num_terminals:
+        return None
+    return tablas.decode_action(tablas.action_entry(estado, terminal))
+
+
+# Niveles de traza de parsear_cadena:
+#   "full"     cada paso con la pila, la pila de símbolos y la entrada restante
+#   "summary"  cada paso solo con estado, token y acción (tamaño constante)
+#   "delta"    como "summary", más el cambio de la pila respecto al paso
+#              anterior y la posición en la entrada (ver reconstruir_traza)
+#   "none"     sin pasos: solo el resultado y el resumen
+NIVELES_TRAZA = ("none", "summary", "delta", "full")
+
+# Pasos por bloque enviado en parsear_cadena_ndjson
+_LINEAS_POR_BLOQUE = 256
+
+
+def _tokenizar(grammar, input_string):
+    """Separa la entrada en tokens por espacios y añade el marcador de fin ($)."""
+    tokens = input_string.strip().split() if input_string.strip() else []
+    tokens.append(grammar.end_marker)
+    return tokens
+
+
+def _pasos_parsing(grammar, parser, tokens, comprimida, traza, estado):
     """
-    Parsea una cadena usando el parser LR(1) y retorna el proceso paso a paso.
+    Ejecuta el parsing sobre los tokens y genera los pasos a medida que se producen.
     
-    Args:
-        grammar: Gramática del parser
-        parser: Parser LR(1) construido
-        input_string: Cadena a parsear (tokens separados por espacios)
+    Con traza "none" no genera pasos. Al terminar deja en `estado` las claves
+    "accepted", "error", "total_steps" y "position" (índice del último token
+    leído: el del error si la cadena se rechaza).
     
-    Returns:
-        dict con el resultado del parsing y los pasos
+    El número de pasos se limita a (tokens + 1) * (estados + 1), como en el
+    driver compilado: solo una tabla con conflictos puede superarlo.
     """
-    resultado = {
-        "success": False,
-        "accepted": False,
-        "error": None,
-        "steps": [],
-        "summary": {}
-    }
+    if traza not in NIVELES_TRAZA:
+        raise ValueError(f"Nivel de traza desconocido: {traza}")
     
-    try:
-        # Tokenizar la entrada
-        tokens = input_string.strip().split() if input_string.strip() else []
-        tokens.append(grammar.end_marker)  # Añadir $
-        
-        # Inicializar la pila y el índice
-        stack = [0]  # Pila de estados
-        symbol_stack = []  # Pila de símbolos (para visualización)
-        input_idx = 0
-        step_num = 0
-        
-        while True:
-            step_num += 1
-            current_state = stack[-1]
-            current_token = tokens[input_idx]
-            
-            # Registrar el paso actual
-            step = {
-                "step": step_num,
-                "stack": list(stack),
-                "symbol_stack": list(symbol_stack),
-                "remaining_input": " ".join(tokens[input_idx:]),
-                "current_state": current_state,
-                "current_token": current_token,
-                "action": None,
-                "action_detail": None
-            }
-            
-            # Buscar la acción en la tabla
+    completa = traza == "full"
+    diferencial = traza == "delta"
+    registrar = traza != "none"
+    max_pasos = (len(tokens) + 1) * (parser.tables.num_states + 1)
+    fin = len(tokens) - 1  # índice del $ que añade _tokenizar
+    
+    estado["accepted"] = False
+    estado["error"] = None
+    
+    # Inicializar la pila y el índice
+    stack = [0]  # Pila de estados
+    symbol_stack = []  # Pila de símbolos (para visualización)
+    input_idx = 0
+    step_num = 0
+    step = None
+    # Cambio de la pila desde el paso anterior (solo para la traza "delta")
+    delta_pop = 0
+    delta_push = []
+    
+    while True:
+        step_num += 1
+        estado["total_steps"] = step_num
+        estado["position"] = input_idx
+        current_state = stack[-1]
+        current_token = tokens[input_idx]
+        
+        # Registrar el paso actual
+        if registrar:
+            step = {"step": step_num}
+            if completa:
+                step["stack"] = list(stack)
+                step["symbol_stack"] = list(symbol_stack)
+                step["remaining_input"] = " ".join(tokens[input_idx:])
+            elif diferencial:
+                step["pop"] = delta_pop
+                step["push"] = delta_push
+                step["input_pos"] = input_idx
+            step["current_state"] = current_state
+            step["current_token"] = current_token
+            step["action"] = None
+            step["action_detail"] = None
+        
+        # Un "$" explícito en la entrada es un error (como en encode_tokens del
+        # driver compilado): solo el marcador de fin añadido puede ser "$"
+        if current_token == grammar.end_marker and input_idx < fin:
+            estado["error"] = f"Error de sintaxis: token '{current_token}' inesperado en estado {current_state}"
+            if registrar:
+                yield step
+            break
+        
+        # Buscar la acción en la tabla
+        if comprimida:
+            accion = _accion_comprimida(parser.compressed_tables, current_state, current_token)
+            if accion is None:
+                estado["error"] = f"Error de sintaxis: token '{current_token}' inesperado en estado {current_state}"
+                if registrar:
+                    yield step
+                break
+            action_type, action_value = accion
+        else:
             if current_state not in parser.parsing_table["action"]:
-                resultado["error"] = f"Estado {current_state} no tiene entradas en la tabla ACTION"
-                resultado["steps"].append(step)
+                estado["error"] = f"Estado {current_state} no tiene entradas en la tabla ACTION"
+                if registrar:
+                    yield step
                 break
             
             state_actions = parser.parsing_table["action"][current_state]
             
             if current_token not in state_actions:
-                resultado["error"] = f"Error de sintaxis: token '{current_token}' inesperado en estado {current_state}"
-                resultado["steps"].append(step)
+                estado["error"] = f"Error de sintaxis: token '{current_token}' inesperado en estado {current_state}"
+                if registrar:
+                    yield step
                 break
             
             action_type, action_value = state_actions[current_token]
-            
-            if action_type == "shift":
+        
+        if action_type == "shift":
+            if registrar:
                 step["action"] = "shift"
                 step["action_detail"] = f"Desplazar a estado {action_value}"
-                resultado["steps"].append(step)
-                
-                # Realizar shift
-                symbol_stack.append(current_token)
-                stack.append(action_value)
-                input_idx += 1
-                
-            elif action_type == "reduce":
-                prod_nt, prod_rhs = grammar.productions[action_value]
+                yield step
+            
+            # Realizar shift
+            symbol_stack.append(current_token)
+            stack.append(action_value)
+            input_idx += 1
+            if diferencial:
+                delta_pop, delta_push = 0, [[action_value, current_token]]
+            
+        elif action_type == "reduce":
+            prod_nt, prod_rhs = grammar.productions[action_value]
+            
+            if registrar:
                 rhs_str = " ".join(prod_rhs) if prod_rhs else "ε"
-                
                 step["action"] = "reduce"
                 step["action_detail"] = f"Reducir por producción {action_value}: {prod_nt} → {rhs_str}"
                 step["production_id"] = action_value
                 step["production_lhs"] = prod_nt
                 step["production_rhs"] = prod_rhs if prod_rhs else ["ε"]
-                resultado["steps"].append(step)
-                
-                # Realizar reduce
-                # Sacar |rhs| símbolos de la pila
-                pop_count = len(prod_rhs) if prod_rhs else 0
-                
-                for _ in range(pop_count):
-                    if stack:
-                        stack.pop()
-                    if symbol_stack:
-                        symbol_stack.pop()
-                
-                # Estado después de sacar
-                state_after_pop = stack[-1] if stack else 0
-                
-                # Buscar GOTO
+                yield step
+            
+            # Realizar reduce
+            # Sacar |rhs| símbolos de la pila
+            pop_count = len(prod_rhs) if prod_rhs else 0
+            
+            if pop_count:
+                del stack[-pop_count:]
+                del symbol_stack[-pop_count:]
+            
+            # Estado después de sacar
+            state_after_pop = stack[-1] if stack else 0
+            
+            # Buscar GOTO
+            if comprimida:
+                tablas = parser.compressed_tables
+                next_state = tablas.goto_entry(state_after_pop, tablas.symbol_ids[prod_nt])
+                if next_state < 0:
+                    estado["error"] = f"No hay transición GOTO para {prod_nt} desde estado {state_after_pop}"
+                    break
+            else:
                 if state_after_pop not in parser.parsing_table["goto"]:
-                    resultado["error"] = f"Estado {state_after_pop} no tiene entradas en la tabla GOTO"
+                    estado["error"] = f"Estado {state_after_pop} no tiene entradas en la tabla GOTO"
                     break
                 
                 goto_entries = parser.parsing_table["goto"][state_after_pop]
                 
                 if prod_nt not in goto_entries:
-                    resultado["error"] = f"No hay transición GOTO para {prod_nt} desde estado {state_after_pop}"
+                    estado["error"] = f"No hay transición GOTO para {prod_nt} desde estado {state_after_pop}"
                     break
                 
                 next_state = goto_entries[prod_nt]
-                
-                # Push del no terminal y el nuevo estado
-                symbol_stack.append(prod_nt)
-                stack.append(next_state)
-                
-            elif action_type == "accept":
-                step["action"] = "accept"
-                step["action_detail"] = "Cadena aceptada ✓"
-                resultado["steps"].append(step)
-                resultado["accepted"] = True
-                resultado["success"] = True
-                break
             
-            else:
-                resultado["error"] = f"Acción desconocida: {action_type}"
-                resultado["steps"].append(step)
-                break
+            # Push del no terminal y el nuevo estado
+            symbol_stack.append(prod_nt)
+            stack.append(next_state)
+            if diferencial:
+                delta_pop, delta_push = pop_count, [[next_state, prod_nt]]
             
-            # Seguridad: evitar loops infinitos
-            if step_num > 1000:
-                resultado["error"] = "Demasiados pasos, posible loop infinito"
-                break
+        elif action_type == "accept":
+            if registrar:
+                step["action"] = "accept"
+                step["action_detail"] = "Cadena aceptada ✓"
+                yield step
+            estado["accepted"] = True
+            break
         
-        # Resumen
-        resultado["summary"] = {
-            "total_steps": len(resultado["steps"]),
-            "input_tokens": tokens[:-1],  # Sin el $
-            "input_length": len(tokens) - 1,
-            "accepted": resultado["accepted"]
-        }
+        else:
+            estado["error"] = f"Acción desconocida: {action_type}"
+            if registrar:
+                yield step
+            break
+        
+        # Seguridad: evitar loops infinitos
+        if step_num >= max_pasos:
+            estado["error"] = "Demasiados pasos, posible loop infinito"
+            break
+
+
+def _resumen_parsing(tokens, estado):
+    """Resumen final del parsing a partir del estado que deja _pasos_parsing."""
+    return {
+        "total_steps": estado.get("total_steps", 0),
+        "input_tokens": tokens[:-1],  # Sin el $
+        "input_length": len(tokens) - 1,
+        "accepted": estado.get("accepted", False)
+    }
+
+
+def parsear_cadena(grammar, parser, input_string, comprimida=False, traza="full"):
+    """
+    Parsea una cadena usando el parser LR(1) y retorna el proceso paso a paso.
+    
+    Args:
+        grammar: Gramática del parser
+        parser: Parser LR(1) construido
+        input_string: Cadena a parsear (tokens separados por espacios)
+        comprimida: Si es True, usa las tablas comprimidas (con reducciones por
+            defecto, así que ante un error pueden aparecer reducciones extra
+            antes de detectarlo)
+        traza: Nivel de detalle de los pasos ("none", "summary", "delta" o
+            "full", ver NIVELES_TRAZA). Con "full" cada paso copia la pila, así
+            que el tamaño de la traza crece con el cuadrado de la entrada; con
+            "delta" crece linealmente y reconstruir_traza recupera la completa
+    
+    Returns:
+        dict con el resultado del parsing y los pasos
+    """
+    resultado = {
+        "success": False,
+        "accepted": False,
+        "error": None,
+        "steps": [],
+        "summary": {}
+    }
+    estado = {}
+    tokens = []
+    
+    try:
+        tokens = _tokenizar(grammar, input_string)
+        resultado["steps"] = list(_pasos_parsing(grammar, parser, tokens, comprimida, traza, estado))
+        resultado["accepted"] = estado["accepted"]
+        resultado["success"] = estado["accepted"]
+        resultado["error"] = estado["error"]
+        resultado["summary"] = _resumen_parsing(tokens, estado)
         
         if not resultado["success"] and not resultado["error"]:
             resultado["error"] = "Parsing terminado sin aceptar la cadena"
@@ -560,6 +906,407 @@ def parsear_cadena(grammar, parser, input_string):
     return resultado
 
 
+def reconstruir_traza(resultado, end_marker="$"):
+    """
+    Reconstruye la traza completa ("full") a partir de un resultado de
+    parsear_cadena con traza "delta".
+    
+    Cada paso delta trae `pop` (estados que se sacaron de la pila desde el
+    paso anterior), `push` (pares [estado, símbolo] que se apilaron después) e
+    `input_pos` (índice del token actual); la pila inicial es [0].
+    
+    Args:
+        resultado: dict con "steps" (traza delta) y "summary" (con input_tokens)
+        end_marker: Marcador de fin de la entrada
+    
+    Returns:
+        Lista de pasos con stack, symbol_stack y remaining_input
+    """
+    tokens = list(resultado["summary"]["input_tokens"]) + [end_marker]
+    stack = [0]
+    symbol_stack = []
+    pasos = []
+    
+    for delta_step in resultado["steps"]:
+        if delta_step["pop"]:
+            del stack[-delta_step["pop"]:]
+            del symbol_stack[-delta_step["pop"]:]
+        for estado, simbolo in delta_step["push"]:
+            stack.append(estado)
+            symbol_stack.append(simbolo)
+        
+        step = {
+            "step": delta_step["step"],
+            "stack": list(stack),
+            "symbol_stack": list(symbol_stack),
+            "remaining_input": " ".join(tokens[delta_step["input_pos"]:]),
+        }
+        step.update(
+            (clave, valor) for clave, valor in delta_step.items()
+            if clave not in ("pop", "push", "input_pos")
+        )
+        pasos.append(step)
+    
+    return pasos
+
+
+def parsear_cadena_ndjson(grammar, parser, input_string, comprimida=False, traza="full"):
+    """
+    Versión en streaming de parsear_cadena: genera líneas JSON (NDJSON).
+    
+    Cada paso se emite como {"type": "step", ...} en cuanto se produce, sin
+    acumular la traza en memoria; la última línea es {"type": "result", ...}
+    con accepted, error y summary.
+    """
+    estado = {}
+    tokens = []
+    error = None
+    bloque = []
+    
+    try:
+        tokens = _tokenizar(grammar, input_string)
+        for step in _pasos_parsing(grammar, parser, tokens, comprimida, traza, estado):
+            bloque.append(json.dumps({"type": "step", **step}, ensure_ascii=False))
+            # Agrupar líneas evita un envío (y un cambio de hilo) por cada paso
+            if len(bloque) == _LINEAS_POR_BLOQUE:
+                yield "\n".join(bloque) + "\n"
+                bloque = []
+        error = estado["error"]
+        if not estado["accepted"] and not error:
+            error = "Parsing terminado sin aceptar la cadena"
+    except Exception as e:
+        error = f"Error durante el parsing: {str(e)}"
+    
+    bloque.append(json.dumps({
+        "type": "result",
+        "success": estado.get("accepted", False),
+        "accepted": estado.get("accepted", False),
+        "error": error,
+        "summary": _resumen_parsing(tokens, estado) if tokens else {}
+    }, ensure_ascii=False))
+    yield "\n".join(bloque) + "\n"
+
+
+def _arbol_json(nodo):
+    """Convierte un árbol (símbolo, hijos) del driver compilado a dicts anidados."""
+    simbolo, hijos = nodo
+    return {"symbol": simbolo, "children": [_arbol_json(hijo) for hijo in hijos]}
+
+
+def reconocer_cadena(parser, input_string, construir_arbol=False, comprimida=False):
+    """
+    Reconoce una cadena con las tablas compiladas del parser (sin traza de pasos).
+
+    Pensado para cargas que solo necesitan aceptar/rechazar y, opcionalmente,
+    el árbol de derivación: mucho más rápido que parsear_cadena.
+
+    Args:
+        parser: Parser LR(1) construido
+        input_string: Cadena a reconocer (tokens separados por espacios)
+        construir_arbol: Si es True, incluye el árbol de derivación
+        comprimida: Si es True, usa las tablas comprimidas en lugar de las densas
+
+    Returns:
+        dict con la aceptación, la posición del error y el árbol (si se pidió)
+    """
+    tokens = input_string.split()
+    tablas = parser.compressed_tables if comprimida else parser.tables
+    aceptada, posicion, arbol = tablas.recognize(
+        tablas.encode_tokens(tokens), build_tree=construir_arbol
+    )
+
+    resultado = {
+        "success": True,
+        "accepted": aceptada,
+        "error": None,
+        "error_position": None,
+        "tree": _arbol_json(arbol) if arbol is not None else None,
+    }
+    if not aceptada:
+        token = tokens[posicion] if posicion < len(tokens) else parser.grammar.end_marker
+        resultado["error_position"] = posicion
+        resultado["error"] = f"Error de sintaxis: token '{token}' inesperado en la posición {posicion}"
+    return resultado
+
+
+def reconocer_con_parser(grammar, parser, input_string, construir_arbol=False, comprimida=False):
+    """reconocer_cadena con la firma (grammar, parser, ...) de las tareas de ejecutar_con_parser."""
+    return reconocer_cadena(parser, input_string, construir_arbol=construir_arbol, comprimida=comprimida)
+
+
+def _resultado_entrada(grammar, parser, entrada, comprimida, traza):
+    """Resultado de una entrada de un lote: aceptación, error y traza opcional."""
+    if traza == "none":
+        # Sin traza basta el driver compilado, mucho más rápido
+        reconocida = reconocer_cadena(parser, entrada, comprimida=comprimida)
+        return {
+            "input": entrada,
+            "accepted": reconocida["accepted"],
+            "error": reconocida["error"],
+            "error_position": reconocida["error_position"],
+        }
+    
+    estado = {}
+    resultado = {"input": entrada, "accepted": False, "error": None, "error_position": None}
+    try:
+        tokens = _tokenizar(grammar, entrada)
+        resultado["steps"] = list(_pasos_parsing(grammar, parser, tokens, comprimida, traza, estado))
+        resultado["accepted"] = estado["accepted"]
+        resultado["error"] = estado["error"]
+        if not estado["accepted"]:
+            resultado["error_position"] = estado["position"]
+            if not resultado["error"]:
+                resultado["error"] = "Parsing terminado sin aceptar la cadena"
+    except Exception as e:
+        resultado["error"] = f"Error durante el parsing: {str(e)}"
+    return resultado
+
+
+def _obtener_parser(texto_gramatica, mode):
+    """Como parsear_gramatica, pero lanza GramaticaInvalida si no se puede construir."""
+    grammar, parser = parsear_gramatica(texto_gramatica, mode=mode)
+    if grammar is None:
+        raise GramaticaInvalida("Error al parsear gramática")
+    return grammar, parser
+
+
+def _parsear_entradas(grammar, parser, entradas, comprimida, traza):
+    """Resultados de un bloque de entradas de un lote con un parser ya construido."""
+    return [_resultado_entrada(grammar, parser, entrada, comprimida, traza) for entrada in entradas]
+
+
+def _referencia_parser(texto_gramatica, mode, parser):
+    """
+    Referencia con la que una tarea del pool recibe un parser ya compilado en
+    el proceso principal: con caché en disco, el texto, el modo y la ruta de
+    su archivo (el proceso lo mapea y comparte sus páginas); si no, el propio
+    parser, que se serializa en el formato binario de persist.py (ver
+    LR1Parser.__getstate__).
+    """
+    if _cache_disco is not None:
+        ruta = _cache_disco.path(huella_gramatica(texto_gramatica, mode))
+        if os.path.exists(ruta):
+            return texto_gramatica, mode, ruta
+    return parser
+
+
+def _ejecutar_con_referencia(referencia, funcion, *args):
+    """
+    Tarea del pool: carga el parser de una referencia de _referencia_parser
+    (sin construirlo) y ejecuta `funcion(grammar, parser, *args)`.
+    """
+    if isinstance(referencia, LR1Parser):
+        parser = referencia
+    else:
+        texto_gramatica, mode, ruta = referencia
+        parser = LR1Parser(parsear_gramatica_desde_texto_interno(texto_gramatica), mode=mode)
+        if not parser.load(ruta):
+            raise RuntimeError(f"No se pudo cargar el parser de la caché en disco: {ruta}")
+        parser.freeze()
+    return funcion(parser.grammar, parser, *args)
+
+
+def _bloques_lote(entradas):
+    """Divide un lote en bloques: uno por proceso si es grande, o uno solo."""
+    if len(entradas) < _LOTE_PARALELO_MIN or _LOTE_PROCESOS <= 1:
+        return [entradas]
+    tamano = -(-len(entradas) // _LOTE_PROCESOS)
+    return [entradas[i:i + tamano] for i in range(0, len(entradas), tamano)]
+
+
+def _resumen_lote(resultados, procesos):
+    """Resultado de parsear_cadenas a partir de los resultados de todas las entradas."""
+    aceptadas = sum(1 for resultado in resultados if resultado["accepted"])
+    return {
+        "results": resultados,
+        "summary": {
+            "total": len(resultados),
+            "accepted": aceptadas,
+            "rejected": len(resultados) - aceptadas,
+            "workers": procesos,
+        }
+    }
+
+
+def parsear_cadenas(texto_gramatica, entradas, mode="lr1", comprimida=False, traza="none"):
+    """
+    Parsea un lote de cadenas con una misma gramática, construyendo el parser una vez.
+    
+    Los lotes de al menos LR1_BATCH_PARALLEL_MIN entradas se reparten en
+    bloques entre los procesos del pool, que reciben el parser ya compilado
+    (ver _referencia_parser); el orden de los resultados es el de las entradas.
+    
+    Args:
+        texto_gramatica: Texto de la gramática
+        entradas: Lista de cadenas (tokens separados por espacios)
+        mode: Modo de construcción del autómata ("lr1", "lalr" o "pager")
+        comprimida: Si es True, usa las tablas comprimidas
+        traza: Nivel de traza de cada entrada (ver NIVELES_TRAZA); con "none"
+            se usa el driver compilado
+    
+    Returns:
+        dict con "results" (uno por entrada, con input, accepted, error,
+        error_position y steps si hay traza) y "summary"
+    """
+    if traza not in NIVELES_TRAZA:
+        raise ValueError(f"Nivel de traza desconocido: {traza}")
+    
+    grammar, parser = _obtener_parser(texto_gramatica, mode)
+    bloques = _bloques_lote(entradas)
+    pool = _obtener_pool() if len(bloques) > 1 else None
+    if pool is None:
+        return _resumen_lote(_parsear_entradas(grammar, parser, entradas, comprimida, traza), 1)
+    
+    referencia = _referencia_parser(texto_gramatica, mode, parser)
+    resultados = []
+    for bloque in pool.map(
+        _ejecutar_con_referencia,
+        *zip(*[(referencia, _parsear_entradas, bloque, comprimida, traza) for bloque in bloques])
+    ):
+        resultados.extend(bloque)
+    return _resumen_lote(resultados, len(bloques))
+
+
+# ============================================================================
+# Ejecución en el pool de procesos (endpoints asíncronos)
+# ============================================================================
+#
+# El proceso principal obtiene cada parser de su caché (una sola construcción
+# para todas las peticiones simultáneas con la misma gramática) y las tareas
+# lo reciben ya compilado (ver ejecutar_con_parser).
+
+def _construir_en_pool(texto_gramatica, mode):
+    """
+    Tarea del pool: construye el parser y lo retorna (se serializa con pickle).
+    Con caché en disco retorna (grammar, None): el parser ya está en el
+    archivo y el llamador lo mapea en lugar de recibir una copia.
+    """
+    grammar, parser = _construir_parser(texto_gramatica, mode)
+    if parser is not None and _cache_disco is not None:
+        return grammar, None
+    return grammar, parser
+
+
+def _obtener_pool():
+    """Pool de procesos compartido (se crea en el primer uso); None si LR1_PROCESS_WORKERS=0."""
+    global _pool_procesos
+    if _PROCESOS <= 0:
+        return None
+    with _lock_pool:
+        if _pool_procesos is None:
+            _pool_procesos = ProcessPool(max_workers=_PROCESOS)
+        return _pool_procesos
+
+
+async def ejecutar_en_pool(funcion, *args, timeout=None):
+    """
+    Ejecuta `funcion(*args)` en el pool de procesos sin bloquear el event loop.
+    
+    Si se agota el tiempo o se cancela la petición (p. ej. el cliente se
+    desconecta), la tarea se cancela; si ya se estaba ejecutando, se termina
+    solo el proceso que la ejecuta (ver ProcessPool.cancel) y las demás tareas
+    siguen. Sin pool (LR1_PROCESS_WORKERS=0) se ejecuta en un hilo, y una
+    tarea que supera el tiempo no se puede interrumpir.
+    
+    Args:
+        funcion: Función de nivel de módulo (serializable con pickle)
+        timeout: Segundos máximos; por defecto LR1_REQUEST_TIMEOUT (0 sin límite)
+    
+    Raises:
+        asyncio.TimeoutError si se agota el tiempo; BrokenProcessPool si el
+        proceso que ejecutaba la tarea terminó inesperadamente
+    """
+    if timeout is None:
+        timeout = _TIMEOUT_TAREA
+    pool = _obtener_pool()
+    if pool is None:
+        return await asyncio.wait_for(asyncio.to_thread(funcion, *args), timeout or None)
+    
+    futuro = pool.submit(funcion, *args)
+    try:
+        return await asyncio.wait_for(asyncio.wrap_future(futuro), timeout or None)
+    except (asyncio.TimeoutError, asyncio.CancelledError):
+        pool.cancel(futuro)
+        raise
+
+
+async def _construir_parser_async(texto_gramatica, mode="lr1"):
+    """Construye el parser en el pool (ver _construir_en_pool)."""
+    grammar, parser = await ejecutar_en_pool(_construir_en_pool, texto_gramatica, mode)
+    if grammar is not None and parser is None:
+        grammar, parser = await asyncio.to_thread(_construir_parser, texto_gramatica, mode)
+    return grammar, parser
+
+
+async def parsear_gramatica_async(texto_gramatica, mode="lr1"):
+    """
+    Versión asíncrona de parsear_gramatica: si la gramática no está en la
+    caché, la construcción se hace en el pool de procesos.
+    """
+    return await _cache_parsers.get_or_build_async(texto_gramatica, _construir_parser_async, mode)
+
+
+async def registrar_gramatica_async(texto_gramatica, mode="lr1"):
+    """Versión asíncrona de registrar_gramatica."""
+    return await _registro_gramaticas.register_async(texto_gramatica, mode, parsear_gramatica_async)
+
+
+async def ejecutar_con_parser(funcion, texto_gramatica, mode, parser, *args):
+    """
+    Ejecuta `funcion(grammar, parser, *args)` en el pool con un parser ya
+    compilado en este proceso (el de la caché o el del registro): la tarea lo
+    recibe por referencia (ver _referencia_parser) en lugar de volver a
+    obtenerlo, o construirlo, a partir del texto. Sin pool se ejecuta en un
+    hilo con el mismo parser.
+    
+    Args:
+        funcion: Función de nivel de módulo (serializable con pickle)
+        texto_gramatica, mode: Gramática y modo con los que se obtuvo el parser
+    
+    Raises:
+        Los mismos errores que ejecutar_en_pool
+    """
+    if _obtener_pool() is None:
+        return await ejecutar_en_pool(funcion, parser.grammar, parser, *args)
+    return await ejecutar_en_pool(
+        _ejecutar_con_referencia, _referencia_parser(texto_gramatica, mode, parser), funcion, *args
+    )
+
+
+async def parsear_cadenas_async(texto_gramatica, entradas, mode="lr1", comprimida=False, traza="none"):
+    """
+    Versión asíncrona de parsear_cadenas: el parser se obtiene una vez con
+    parsear_gramatica_async y cada bloque es una tarea del pool.
+    
+    Raises:
+        GramaticaInvalida si la gramática no se puede construir
+    """
+    if traza not in NIVELES_TRAZA:
+        raise ValueError(f"Nivel de traza desconocido: {traza}")
+    
+    grammar, parser = await parsear_gramatica_async(texto_gramatica, mode)
+    if grammar is None:
+        raise GramaticaInvalida("Error al parsear gramática")
+    return await parsear_cadenas_con_parser_async(texto_gramatica, mode, parser, entradas, comprimida, traza)
+
+
+async def parsear_cadenas_con_parser_async(texto_gramatica, mode, parser, entradas, comprimida=False, traza="none"):
+    """
+    Versión de parsear_cadenas_async con un parser ya compilado (p. ej. el del
+    registro): cada bloque es una tarea del pool que recibe el parser por
+    referencia (ver ejecutar_con_parser), sin reconstruirlo.
+    """
+    if traza not in NIVELES_TRAZA:
+        raise ValueError(f"Nivel de traza desconocido: {traza}")
+    
+    bloques = _bloques_lote(entradas)
+    partes = await asyncio.gather(*(
+        ejecutar_con_parser(_parsear_entradas, texto_gramatica, mode, parser, bloque, comprimida, traza)
+        for bloque in bloques
+    ))
+    return _resumen_lote([resultado for parte in partes for resultado in parte], len(bloques))
+
+
 if __name__ == "__main__":
     print("=" * 80)
     print("API HELPER - Test de funciones")
@@ -592,3 +1339,30 @@ C -> d"""
             print(f"\n... (+{len(lines) - 50} líneas más)")
     else:
         print(f"✗ Error: {resultado['error']}")
+    
+    # Peticiones simultáneas con la misma gramática (como varios POST
+    # /parse/recognize a la vez): una sola construcción para todas
+    print("\n" + "=" * 80)
+    print("Concurrencia: peticiones idénticas simultáneas")
+    print("=" * 80)
+    gramatica_concurrente = """E -> E + T
+E -> T
+T -> T * F
+T -> F
+F -> ( E )
+F -> id"""
+    
+    async def _peticion():
+        _, parser = await parsear_gramatica_async(gramatica_concurrente)
+        return await ejecutar_con_parser(reconocer_con_parser, gramatica_concurrente, "lr1", parser, "id + id * id")
+    
+    async def _peticiones_simultaneas(n):
+        return await asyncio.gather(*(_peticion() for _ in range(n)))
+    
+    antes = _cache_parsers.stats()
+    respuestas = asyncio.run(_peticiones_simultaneas(16))
+    despues = _cache_parsers.stats()
+    construcciones = despues["misses"] - antes["misses"]
+    print(f"Peticiones: {len(respuestas)} (aceptadas: {sum(r['accepted'] for r in respuestas)})")
+    print(f"Construcciones: {construcciones}, esperaron la misma: {despues['coalesced'] - antes['coalesced']}")
+    print("✓ Una sola construcción" if construcciones == 1 else "✗ Se construyó más de una vez")
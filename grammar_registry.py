@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+Grammar Registry - Registro de gramáticas compiladas con ids persistentes
+Permite compilar una gramática una vez y consultarla después por su id
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from parser_cache import huella_gramatica
+
+
+class GrammarRegistry:
+    """
+    Registro acotado de gramáticas compiladas, indexado por un id derivado del
+    contenido (la huella del texto normalizado y el modo).
+
+    El mismo texto y modo producen siempre el mismo id, así que registrar de
+    nuevo una gramática expulsada la recupera con el id que ya tenía el cliente.
+    Las entradas sin uso durante `idle_seconds` se expulsan, y si se supera
+    `max_entries` se expulsa la usada hace más tiempo.
+    """
+
+    def __init__(self, max_entries=256, idle_seconds=3600, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.idle_seconds = idle_seconds
+        self._clock = clock
+        self._entries = OrderedDict()  # id -> dict(text, grammar, parser, mode, last_access)
+        self._lock = threading.Lock()
+        self.registrations = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _evict_idle(self, now):
+        # Las entradas están en orden de último acceso: las inactivas van primero
+        while self._entries:
+            grammar_id, entry = next(iter(self._entries.items()))
+            if now - entry["last_access"] < self.idle_seconds:
+                break
+            del self._entries[grammar_id]
+            self.evictions += 1
+
+    def register(self, texto, mode, constructor):
+        """
+        Compila (o recupera) una gramática y retorna su id.
+
+        Args:
+            texto: Texto de la gramática
+            mode: Modo de construcción del autómata
+            constructor: Función (texto, mode) -> (grammar, parser)
+
+        Returns:
+            El id de la gramática, o None si no se pudo compilar
+        """
+        grammar_id = huella_gramatica(texto, mode)
+        if self.get(grammar_id, count=False) is not None:
+            return grammar_id
+
+        # La construcción se hace fuera del lock para no bloquear las consultas
+        grammar, parser = constructor(texto, mode)
+        return self._insert(grammar_id, texto, mode, grammar, parser)
+
+    async def register_async(self, texto, mode, constructor):
+        """Igual que register, pero `constructor` es una corrutina."""
+        grammar_id = huella_gramatica(texto, mode)
+        if self.get(grammar_id, count=False) is not None:
+            return grammar_id
+
+        grammar, parser = await constructor(texto, mode)
+        return self._insert(grammar_id, texto, mode, grammar, parser)
+
+    def _insert(self, grammar_id, texto, mode, grammar, parser):
+        if grammar is None or parser is None:
+            return None
+
+        with self._lock:
+            now = self._clock()
+            self._evict_idle(now)
+            self._entries[grammar_id] = {
+                "text": texto,
+                "grammar": grammar,
+                "parser": parser,
+                "mode": mode,
+                "last_access": now,
+            }
+            self._entries.move_to_end(grammar_id)
+            self.registrations += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return grammar_id
+
+    def get(self, grammar_id, count=True):
+        """
+        Retorna la entrada {text, grammar, parser, mode, last_access} de un id (o None)
+        y la marca como usada.
+        """
+        with self._lock:
+            now = self._clock()
+            self._evict_idle(now)
+            entry = self._entries.get(grammar_id)
+            if entry is None:
+                if count:
+                    self.misses += 1
+                return None
+            entry["last_access"] = now
+            self._entries.move_to_end(grammar_id)
+            if count:
+                self.hits += 1
+            return entry
+
+    def remove(self, grammar_id):
+        """Elimina una gramática del registro; retorna si estaba registrada."""
+        with self._lock:
+            return self._entries.pop(grammar_id, None) is not None
+
+    def stats(self):
+        """Retorna las estadísticas de uso del registro."""
+        with self._lock:
+            self._evict_idle(self._clock())
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "idle_seconds": self.idle_seconds,
+                "registrations": self.registrations,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
@@ -4,9 +4,17 @@ Parser LR(1) - Paquete Modular
 Implementa el análisis sintáctico LR(1) con arquitectura modular.
 """
 
+from ._version import __version__
 from .grammar import Grammar
 from .item import LR1Item
+from .compiled import CompiledGrammar
 from .parser import LR1Parser
+from .tables import CompiledTables
+from .compressed import CompressedTables
+from .persist import TableCache
+from .limits import BuildLimits, BuildLimitExceeded
+from .render import RenderPool, RenderPoolSaturated, RenderTimeout
+from .item_graph import ItemGraph
 from .visualizer import RegularGrammarAFNVisualizer
 from .examples import (
     create_example_grammar_1,
@@ -14,11 +22,20 @@ from .examples import (
     create_example_grammar_3,
 )
 
-__version__ = "1.0.0"
 __all__ = [
     "Grammar",
     "LR1Item",
+    "CompiledGrammar",
     "LR1Parser",
+    "CompiledTables",
+    "CompressedTables",
+    "TableCache",
+    "BuildLimits",
+    "BuildLimitExceeded",
+    "RenderPool",
+    "RenderPoolSaturated",
+    "RenderTimeout",
+    "ItemGraph",
     "RegularGrammarAFNVisualizer",
     "create_example_grammar_1",
     "create_example_grammar_2",
@@ -0,0 +1,4 @@
+# -*- coding: utf-8 -*-
+"""Versión del paquete (también invalida las tablas persistidas en disco)"""
+
+__version__ = "1.0.0"
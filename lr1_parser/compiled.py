@@ -0,0 +1,321 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo CompiledGrammar
+Define la representación compilada de una gramática: símbolos internados como
+enteros densos y producciones como tuplas de enteros.
+"""
+
+from .item import LR1Item
+
+
+def to_bits(symbols):
+    """Convierte un iterable de ids de terminales en un bitset (int)"""
+    bits = 0
+    for symbol in symbols:
+        bits |= 1 << symbol
+    return bits
+
+
+def iter_bits(bits):
+    """Itera (en orden creciente) los ids de los bits activos de un bitset"""
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+def digraph(relation, base):
+    """
+    Algoritmo digraph de DeRemer y Pennello.
+
+    Calcula F(x) = base(x) ∪ ⋃{F(y) | x R y} para todos los nodos con un único
+    recorrido en profundidad (iterativo, sin recursión): los nodos de una misma
+    componente fuertemente conexa comparten resultado, así que no hace falta
+    iterar hasta un punto fijo.
+
+    Args:
+        relation: Lista indexada por nodo con los sucesores de cada nodo
+        base: Lista de bitsets iniciales por nodo
+
+    Returns:
+        Lista de bitsets resultantes por nodo
+    """
+    size = len(base)
+    result = list(base)
+    depth = [0] * size  # 0 = sin visitar, infinity = componente ya cerrada
+    infinity = size + 1
+    stack = []
+
+    for root in range(size):
+        if depth[root]:
+            continue
+        stack.append(root)
+        depth[root] = len(stack)
+        frames = [(root, len(stack), iter(relation[root]))]
+
+        while frames:
+            node, node_depth, successors = frames[-1]
+            for successor in successors:
+                if depth[successor] == 0:
+                    # Descender; el nodo actual se reanuda al cerrar el sucesor
+                    stack.append(successor)
+                    depth[successor] = len(stack)
+                    frames.append((successor, len(stack), iter(relation[successor])))
+                    break
+                if depth[successor] < depth[node]:
+                    depth[node] = depth[successor]
+                result[node] |= result[successor]
+            else:
+                frames.pop()
+                if depth[node] == node_depth:
+                    # Raíz de la componente: todos sus nodos comparten resultado
+                    while True:
+                        top = stack.pop()
+                        depth[top] = infinity
+                        result[top] = result[node]
+                        if top == node:
+                            break
+                if frames:
+                    parent = frames[-1][0]
+                    if depth[node] < depth[parent]:
+                        depth[parent] = depth[node]
+                    result[parent] |= result[node]
+
+    return result
+
+
+class CompiledGrammar:
+    """
+    Gramática compilada a enteros.
+
+    Los terminales ocupan los ids [0, num_terminals) (el 0 es siempre el
+    marcador de fin "$") y los no terminales los ids [num_terminals, num_symbols)
+    (el primero es siempre el símbolo inicial aumentado). Así, comprobar si un
+    símbolo es terminal es una simple comparación.
+    """
+
+    def __init__(self, grammar):
+        """
+        Compila una gramática ya aumentada y con terminales calculados.
+
+        Args:
+            grammar: Objeto Grammar (tras augment y compute_terminals_and_non_terminals)
+        """
+        self.epsilon = grammar.epsilon
+        terminals = sorted(grammar.terminals - {grammar.epsilon, grammar.end_marker})
+        non_terminals = sorted(grammar.non_terminals - {grammar.start_symbol})
+
+        self.symbols = tuple(
+            [grammar.end_marker] + terminals + [grammar.start_symbol] + non_terminals
+        )
+        self.symbol_ids = {name: idx for idx, name in enumerate(self.symbols)}
+        self.num_terminals = len(terminals) + 1
+        self.num_symbols = len(self.symbols)
+        self.end_marker = 0
+        self.start_symbol = self.num_terminals
+
+        prod_lhs = []
+        prod_rhs = []
+        prods_by_lhs = [[] for _ in range(self.num_symbols)]
+        for prod_id, (non_terminal, production) in enumerate(grammar.productions):
+            lhs = self.symbol_ids[non_terminal]
+            # epsilon explícito en el lado derecho equivale a la cadena vacía
+            rhs = tuple(
+                self.symbol_ids[symbol]
+                for symbol in production
+                if symbol != grammar.epsilon
+            )
+            prod_lhs.append(lhs)
+            prod_rhs.append(rhs)
+            prods_by_lhs[lhs].append(prod_id)
+
+        self.prod_lhs = tuple(prod_lhs)
+        self.prod_rhs = tuple(prod_rhs)
+        self.prods_by_lhs = tuple(tuple(ids) for ids in prods_by_lhs)
+
+        # Items LR(0) ("núcleos") como ids densos: el núcleo (p, punto) es
+        # item_base[p] + punto, y avanzar el punto es sumar 1 al id
+        item_base = []
+        core_prod = []
+        core_dot = []
+        core_next = []
+        for prod_id, rhs in enumerate(self.prod_rhs):
+            item_base.append(len(core_prod))
+            for dot_position in range(len(rhs) + 1):
+                core_prod.append(prod_id)
+                core_dot.append(dot_position)
+                core_next.append(rhs[dot_position] if dot_position < len(rhs) else -1)
+        self.item_base = tuple(item_base)
+        self.core_prod = tuple(core_prod)
+        self.core_dot = tuple(core_dot)
+        self.core_next = tuple(core_next)
+
+        # Lados derechos con nombres, compartidos por todos los items decodificados
+        self.rhs_names = tuple(
+            tuple(self.symbols[symbol] for symbol in rhs) for rhs in self.prod_rhs
+        )
+
+    @property
+    def num_cores(self):
+        return len(self.core_prod)
+
+    @property
+    def num_productions(self):
+        return len(self.prod_lhs)
+
+    def is_terminal(self, symbol):
+        """Indica si el id de símbolo corresponde a un terminal"""
+        return symbol < self.num_terminals
+
+    def compute_nullable(self):
+        """
+        Calcula qué símbolos derivan epsilon en tiempo lineal: cada producción
+        lleva la cuenta de los símbolos de su lado derecho aún no anulables.
+        """
+        nullable = [False] * self.num_symbols
+        remaining = [len(rhs) for rhs in self.prod_rhs]
+        occurrences = [[] for _ in range(self.num_symbols)]
+        for prod_id, rhs in enumerate(self.prod_rhs):
+            for symbol in rhs:
+                occurrences[symbol].append(prod_id)
+
+        pending = [prod_id for prod_id, count in enumerate(remaining) if count == 0]
+        while pending:
+            lhs = self.prod_lhs[pending.pop()]
+            if nullable[lhs]:
+                continue
+            nullable[lhs] = True
+            for prod_id in occurrences[lhs]:
+                remaining[prod_id] -= 1
+                if remaining[prod_id] == 0:
+                    pending.append(prod_id)
+
+        return nullable
+
+    def compute_first(self):
+        """
+        Calcula FIRST para cada símbolo.
+
+        X depende de Y si existe X -> α Y β con α anulable; FIRST(X) es la
+        unión de los FIRST alcanzables por esa relación y se resuelve con
+        digraph en un solo recorrido.
+
+        Returns:
+            Tupla (first, nullable): first[s] es el bitset de ids de terminales
+            de FIRST(s) y nullable[s] indica si s deriva epsilon
+        """
+        nullable = self.compute_nullable()
+
+        # FIRST de terminales es el terminal mismo
+        base = [1 << symbol if symbol < self.num_terminals else 0
+                for symbol in range(self.num_symbols)]
+        relation = [set() for _ in range(self.num_symbols)]
+        for prod_id, lhs in enumerate(self.prod_lhs):
+            for symbol in self.prod_rhs[prod_id]:
+                relation[lhs].add(symbol)
+                if not nullable[symbol]:
+                    break
+
+        return digraph(relation, base), nullable
+
+    def compute_follow(self, first, nullable, suffix=None):
+        """
+        Calcula FOLLOW para cada no terminal (lista de bitsets indexada por id).
+
+        Para cada A -> α B β, FOLLOW(B) contiene FIRST(β) y, si β es anulable,
+        depende de FOLLOW(A); las dependencias se resuelven con digraph.
+
+        Args:
+            first, nullable: Resultado de compute_first
+            suffix: Resultado de compute_suffix_first (se calcula si no se pasa)
+        """
+        if suffix is None:
+            suffix = self.compute_suffix_first(first, nullable)
+        suffix_first, suffix_nullable = suffix
+
+        # FOLLOW del símbolo inicial contiene $
+        base = [0] * self.num_symbols
+        base[self.start_symbol] = 1 << self.end_marker
+        relation = [set() for _ in range(self.num_symbols)]
+
+        for prod_id, lhs in enumerate(self.prod_lhs):
+            core = self.item_base[prod_id]
+            for dot_position, symbol in enumerate(self.prod_rhs[prod_id]):
+                if symbol < self.num_terminals:
+                    continue
+                base[symbol] |= suffix_first[core + dot_position]
+                if suffix_nullable[core + dot_position]:
+                    relation[symbol].add(lhs)
+
+        return digraph(relation, base)
+
+    def first_of_sequence(self, sequence, first, nullable):
+        """
+        Calcula FIRST de una secuencia de ids de símbolos.
+
+        Returns:
+            Tupla (bitset de terminales, la secuencia deriva epsilon)
+        """
+        result = 0
+        for symbol in sequence:
+            result |= first[symbol]
+            if not nullable[symbol]:
+                return result, False
+        return result, True
+
+    def compute_suffix_first(self, first, nullable):
+        """
+        Precalcula FIRST(β) para cada núcleo [A → α . X β].
+
+        Returns:
+            Tupla (suffix_first, suffix_nullable) indexada por id de núcleo:
+            bitset de FIRST(β) e indicador de si β deriva epsilon
+        """
+        suffix_first = [0] * self.num_cores
+        suffix_nullable = [True] * self.num_cores
+
+        for prod_id, rhs in enumerate(self.prod_rhs):
+            base = self.item_base[prod_id]
+            # Recorrer la producción de derecha a izquierda acumulando FIRST(rhs[k:])
+            bits = 0
+            all_nullable = True
+            for dot_position in range(len(rhs) - 1, -1, -1):
+                # El núcleo con el punto en dot_position ve como β a rhs[dot_position + 1:]
+                suffix_first[base + dot_position] = bits
+                suffix_nullable[base + dot_position] = all_nullable
+                symbol = rhs[dot_position]
+                if nullable[symbol]:
+                    bits |= first[symbol]
+                else:
+                    bits = first[symbol]
+                    all_nullable = False
+
+        return tuple(suffix_first), tuple(suffix_nullable)
+
+    def first_names(self, first, nullable):
+        """Convierte FIRST a un dict {nombre: conjunto de nombres} (incluye epsilon)"""
+        names = {}
+        for symbol, terminals in enumerate(first):
+            names[self.symbols[symbol]] = {self.symbols[t] for t in iter_bits(terminals)}
+            if nullable[symbol]:
+                names[self.symbols[symbol]].add(self.epsilon)
+        names[self.epsilon] = {self.epsilon}
+        return names
+
+    def follow_names(self, follow):
+        """Convierte FOLLOW a un dict {no terminal: conjunto de nombres}"""
+        return {
+            self.symbols[symbol]: {self.symbols[t] for t in iter_bits(follow[symbol])}
+            for symbol in range(self.num_terminals, self.num_symbols)
+        }
+
+    def decode_items(self, core, lookaheads):
+        """Expande un núcleo con su bitset de lookaheads en LR1Item con nombres"""
+        prod_id = self.core_prod[core]
+        non_terminal = self.symbols[self.prod_lhs[prod_id]]
+        production = self.rhs_names[prod_id]
+        dot_position = self.core_dot[core]
+        for lookahead in iter_bits(lookaheads):
+            yield LR1Item(
+                non_terminal, production, dot_position, self.symbols[lookahead]
+            )
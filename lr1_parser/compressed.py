@@ -0,0 +1,374 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo CompressedTables
+Define la forma comprimida de las tablas ACTION/GOTO: reducción por defecto
+por estado, filas idénticas compartidas y empaquetado por desplazamiento
+(comb) de las entradas restantes.
+"""
+
+import random
+import sys
+import time
+from array import array
+from collections import Counter
+
+from .tables import CompiledTables
+
+
+def pack_rows(rows, width):
+    """
+    Empaqueta filas dispersas en un único vector por desplazamiento (first fit).
+
+    Cada fila r recibe un desplazamiento base[r] tal que sus celdas
+    base[r] + columna no chocan con las de otra fila; el vector check guarda
+    la fila dueña de cada celda para distinguir entradas propias de ajenas.
+
+    Args:
+        rows: Lista de listas de pares (columna, valor) ordenadas por columna
+        width: Número de columnas (se rellena el final para no salir de rango)
+
+    Returns:
+        Tupla (bases, check, values) como arrays de enteros
+    """
+    bases = array("i", [0]) * len(rows)
+    check = array("i")
+    values = array("i")
+    # Celdas ocupadas como bitmap (bit i = check[i] >= 0)
+    used = 0
+    first_free = 0
+
+    # Las filas más densas primero dejan huecos que aprovechan las más dispersas
+    for row_id in sorted(range(len(rows)), key=lambda r: -len(rows[r])):
+        entries = rows[row_id]
+        if not entries:
+            continue
+        start = max(first_free - entries[0][0], 0)
+
+        # Bit b de collide = el desplazamiento start + b choca en alguna
+        # columna: se prueban todos a la vez y se toma el primero libre
+        window = used >> start
+        collide = 0
+        mask = 0
+        for column, _ in entries:
+            collide |= window >> column
+            mask |= 1 << column
+        free = ~collide
+        base = start + (free & -free).bit_length() - 1
+
+        needed = base + entries[-1][0] + 1 - len(check)
+        if needed > 0:
+            check.extend([-1] * needed)
+            values.extend([0] * needed)
+        for column, value in entries:
+            check[base + column] = row_id
+            values[base + column] = value
+        used |= mask << base
+        bases[row_id] = base
+
+        first_free = (~used & (used + 1)).bit_length() - 1
+
+    padding = max(bases, default=0) + width - len(check)
+    if padding > 0:
+        check.extend([-1] * padding)
+        values.extend([0] * padding)
+    return bases, check, values
+
+
+class CompressedTables:
+    """
+    Tablas ACTION/GOTO comprimidas a partir de CompiledTables (misma codificación).
+
+    ACTION:
+        - Cada estado tiene una reducción por defecto (la más frecuente de su
+          fila) que sustituye a todas sus entradas de error y de esa reducción.
+          El error se sigue detectando antes de desplazar el token inválido.
+        - Los estados con las mismas entradas restantes comparten fila.
+        - Las filas se empaquetan por desplazamiento: la entrada de (estado, t)
+          está en values[base[fila] + t] si check[base[fila] + t] == fila.
+
+    GOTO:
+        - Cada no terminal tiene un destino por defecto (el más frecuente) y las
+          columnas restantes se empaquetan igual, indexadas por estado.
+    """
+
+    # Arrays que forman la tabla comprimida (además de prod_lhs y prod_len)
+    ARRAYS = (
+        "default_reduction", "action_row", "action_base", "action_check",
+        "action_values", "default_goto", "goto_base", "goto_check", "goto_values",
+    )
+
+    def __init__(self, tables):
+        """
+        Comprime unas tablas densas.
+
+        Args:
+            tables: CompiledTables ya construidas
+        """
+        self._init_grammar(tables)
+        self._compress_action(tables)
+        self._compress_goto(tables)
+
+    def _init_grammar(self, tables):
+        self.symbols = tables.symbols
+        self.symbol_ids = tables.symbol_ids
+        self.num_states = tables.num_states
+        self.num_terminals = tables.num_terminals
+        self.num_non_terminals = tables.num_non_terminals
+        self.prod_lhs = tables.prod_lhs
+        self.prod_len = tables.prod_len
+
+    @classmethod
+    def from_buffers(cls, tables, num_action_rows, arrays):
+        """
+        Reconstruye la tabla comprimida sobre arrays ya empaquetados.
+
+        Args:
+            tables: CompiledTables de la misma gramática
+            num_action_rows: Número de filas distintas de ACTION
+            arrays: dict {nombre: array o memoryview} con los nombres de ARRAYS
+        """
+        compressed = cls.__new__(cls)
+        compressed._init_grammar(tables)
+        compressed.num_action_rows = num_action_rows
+        for name in cls.ARRAYS:
+            setattr(compressed, name, arrays[name])
+        return compressed
+
+    def _compress_action(self, tables):
+        num_terminals = self.num_terminals
+        self.default_reduction = array("i", [0]) * self.num_states
+        self.action_row = array("i", [0]) * self.num_states
+        row_ids = {}
+        rows = []
+
+        for state_idx in range(self.num_states):
+            offset = state_idx * num_terminals
+            row = tables.action[offset:offset + num_terminals]
+
+            # Aceptar (-1) nunca es la reducción por defecto: exige ver "$"
+            reductions = Counter(entry for entry in row if entry < -1)
+            default = reductions.most_common(1)[0][0] if reductions else 0
+            self.default_reduction[state_idx] = default
+
+            residual = tuple(
+                (terminal, entry)
+                for terminal, entry in enumerate(row)
+                if entry and entry != default
+            )
+            row_id = row_ids.get(residual)
+            if row_id is None:
+                row_id = row_ids[residual] = len(rows)
+                rows.append(residual)
+            self.action_row[state_idx] = row_id
+
+        self.num_action_rows = len(rows)
+        self.action_base, self.action_check, self.action_values = pack_rows(
+            rows, num_terminals
+        )
+
+    def _compress_goto(self, tables):
+        num_non_terminals = self.num_non_terminals
+        self.default_goto = array("i", [-1]) * num_non_terminals
+        columns = []
+
+        for non_terminal in range(num_non_terminals):
+            column = [
+                (state_idx, tables.goto[state_idx * num_non_terminals + non_terminal])
+                for state_idx in range(self.num_states)
+            ]
+            targets = Counter(target for _, target in column if target >= 0)
+            default = targets.most_common(1)[0][0] if targets else -1
+            self.default_goto[non_terminal] = default
+            columns.append([
+                (state_idx, target)
+                for state_idx, target in column
+                if target >= 0 and target != default
+            ])
+
+        self.goto_base, self.goto_check, self.goto_values = pack_rows(
+            columns, self.num_states
+        )
+
+    def action_entry(self, state, terminal):
+        """Entrada codificada de ACTION para (estado, id de terminal)"""
+        row = self.action_row[state]
+        index = self.action_base[row] + terminal
+        if self.action_check[index] == row:
+            return self.action_values[index]
+        return self.default_reduction[state]
+
+    def goto_entry(self, state, non_terminal):
+        """Estado destino de GOTO para (estado, id de no terminal), o -1"""
+        column = non_terminal - self.num_terminals
+        index = self.goto_base[column] + state
+        if self.goto_check[index] == column:
+            return self.goto_values[index]
+        return self.default_goto[column]
+
+    def nbytes(self):
+        """Memoria ocupada por los arrays comprimidos (en bytes)"""
+        tables = [getattr(self, name) for name in self.ARRAYS]
+        tables += [self.prod_lhs, self.prod_len]
+        return sum(table.itemsize * len(table) for table in tables)
+
+    encode_tokens = CompiledTables.encode_tokens
+    decode_action = staticmethod(CompiledTables.decode_action)
+
+    def recognize(self, token_ids, build_tree=False, max_steps=None):
+        """
+        Reconoce una secuencia de ids de terminales sobre las tablas comprimidas.
+        Mismo contrato que CompiledTables.recognize.
+        """
+        action_row = self.action_row
+        action_base = self.action_base
+        action_check = self.action_check
+        action_values = self.action_values
+        default_reduction = self.default_reduction
+        goto_base = self.goto_base
+        goto_check = self.goto_check
+        goto_values = self.goto_values
+        default_goto = self.default_goto
+        prod_lhs = self.prod_lhs
+        prod_len = self.prod_len
+        symbols = self.symbols
+        num_terminals = self.num_terminals
+
+        if max_steps is None:
+            max_steps = (len(token_ids) + 1) * (self.num_states + 1)
+
+        stack = [0]
+        nodes = [] if build_tree else None
+        position = 0
+        token = token_ids[0]
+        state = 0
+
+        for _ in range(max_steps):
+            if token < 0:
+                return False, position, None
+            row = action_row[state]
+            index = action_base[row] + token
+            if action_check[index] == row:
+                entry = action_values[index]
+            else:
+                entry = default_reduction[state]
+
+            if entry > 0:
+                state = entry - 1
+                stack.append(state)
+                if build_tree:
+                    nodes.append((symbols[token], ()))
+                position += 1
+                token = token_ids[position]
+
+            elif entry < 0:
+                prod_id = -entry - 1
+                if prod_id == 0:
+                    return True, position, nodes[0] if build_tree else None
+
+                length = prod_len[prod_id]
+                lhs = prod_lhs[prod_id]
+                if length:
+                    del stack[-length:]
+                    if build_tree:
+                        children = tuple(nodes[-length:])
+                        del nodes[-length:]
+                if build_tree:
+                    nodes.append((symbols[lhs], children if length else ()))
+
+                column = lhs - num_terminals
+                index = goto_base[column] + stack[-1]
+                if goto_check[index] == column:
+                    state = goto_values[index]
+                else:
+                    state = default_goto[column]
+                if state < 0:
+                    return False, position, None
+                stack.append(state)
+
+            else:
+                return False, position, None
+
+        return False, position, None
+
+    def to_json(self):
+        """Representación serializable (listas de enteros) de las tablas comprimidas"""
+        return {
+            "encoding": "0 = error, +k = shift k-1, -k = reduce k-1 (-1 = accept)",
+            "terminals": list(self.symbols[:self.num_terminals]),
+            "non_terminals": list(self.symbols[self.num_terminals:]),
+            **{name: getattr(self, name).tolist() for name in self.ARRAYS},
+        }
+
+
+def compression_report(parser, samples=2000, seed=0):
+    """
+    Compara la tabla ACTION/GOTO en sus tres formas: dicts con nombres, matrices
+    densas y comprimida.
+
+    La latencia se mide consultando ACTION en los mismos pares (estado,
+    terminal) elegidos al azar (con semilla fija) en las tres formas.
+
+    Returns:
+        dict con los bytes de cada forma, las razones de compresión y los
+        nanosegundos por consulta
+    """
+    dense = parser.tables
+    compressed = parser.compressed_tables
+
+    # Forma con dicts anidados (la de parsing_table antes de las matrices)
+    dict_tables = {
+        name: {state: dict(row) for state, row in view.items()}
+        for name, view in parser.parsing_table.items()
+    }
+    action_table = dict_tables["action"]
+
+    dict_bytes = 0
+    for table in dict_tables.values():
+        dict_bytes += sys.getsizeof(table)
+        for row in table.values():
+            dict_bytes += sys.getsizeof(row)
+            dict_bytes += sum(sys.getsizeof(entry) for entry in row.values())
+
+    rng = random.Random(seed)
+    pairs = [
+        (rng.randrange(dense.num_states), rng.randrange(dense.num_terminals))
+        for _ in range(samples if dense.num_states else 0)
+    ]
+    named_pairs = [(state, dense.symbols[terminal]) for state, terminal in pairs]
+
+    def per_lookup(lookups):
+        start = time.perf_counter()
+        lookups()
+        return round((time.perf_counter() - start) * 1e9 / max(len(pairs), 1), 1)
+
+    def dict_lookups():
+        for state, terminal in named_pairs:
+            action_table.get(state, {}).get(terminal)
+
+    def dense_lookups():
+        action = dense.action
+        width = dense.num_terminals
+        for state, terminal in pairs:
+            action[state * width + terminal]
+
+    def compressed_lookups():
+        action_entry = compressed.action_entry
+        for state, terminal in pairs:
+            action_entry(state, terminal)
+
+    dense_bytes = dense.nbytes()
+    compressed_bytes = compressed.nbytes()
+    return {
+        "states": dense.num_states,
+        "action_rows": compressed.num_action_rows,
+        "dict_bytes": dict_bytes,
+        "dense_bytes": dense_bytes,
+        "compressed_bytes": compressed_bytes,
+        "ratio_vs_dense": round(dense_bytes / compressed_bytes, 2) if compressed_bytes else 0.0,
+        "ratio_vs_dict": round(dict_bytes / compressed_bytes, 2) if compressed_bytes else 0.0,
+        "lookup_ns": {
+            "dict": per_lookup(dict_lookups),
+            "dense": per_lookup(dense_lookups),
+            "compressed": per_lookup(compressed_lookups),
+        },
+    }
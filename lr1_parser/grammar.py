@@ -7,6 +7,9 @@ Define la clase Grammar para representar gramáticas libres de contexto.
 from collections import defaultdict
 from typing import Set, Dict, List, Tuple
 
+from .compiled import CompiledGrammar, to_bits
+from .immutable import FrozenDict
+
 
 class Grammar:
     """Clase para representar una gramática libre de contexto"""
@@ -18,6 +21,34 @@ class Grammar:
         self.non_terminals = set()
         self.epsilon = "epsilon"
         self.end_marker = "$"
+        # Índices mantenidos por add_production:
+        #   no_terminal -> [ids de producción]  y  (no_terminal, produccion) -> id
+        self.productions_by_lhs = defaultdict(list)
+        self.production_ids = {}
+        self._frozen = False
+
+    def __setattr__(self, name, value):
+        if getattr(self, "_frozen", False):
+            raise AttributeError("La gramática está congelada y no puede modificarse")
+        super().__setattr__(name, value)
+
+    def freeze(self):
+        """Congela la gramática: producciones y conjuntos pasan a ser inmutables"""
+        if self._frozen:
+            return self
+        self.productions = tuple(
+            (non_terminal, tuple(production))
+            for non_terminal, production in self.productions
+        )
+        self.terminals = frozenset(self.terminals)
+        self.non_terminals = frozenset(self.non_terminals)
+        self.productions_by_lhs = FrozenDict(
+            (non_terminal, tuple(ids))
+            for non_terminal, ids in self.productions_by_lhs.items()
+        )
+        self.production_ids = FrozenDict(self.production_ids)
+        self._frozen = True
+        return self
 
     def add_production(self, non_terminal, production):
         """Añade una producción a la gramática"""
@@ -25,6 +56,29 @@ class Grammar:
             self.start_symbol = non_terminal
         self.productions.append((non_terminal, production))
         self.non_terminals.add(non_terminal)
+        self._index_production(len(self.productions) - 1)
+
+    def augment(self, augmented_start):
+        """Añade la producción S' -> S al inicio y la convierte en símbolo inicial"""
+        self.productions.insert(0, (augmented_start, [self.start_symbol]))
+        self.non_terminals.add(augmented_start)
+        self.start_symbol = augmented_start
+
+        # Insertar al inicio desplaza todos los ids: se reconstruyen los índices
+        self.productions_by_lhs = defaultdict(list)
+        self.production_ids = {}
+        for prod_id in range(len(self.productions)):
+            self._index_production(prod_id)
+
+    def _index_production(self, prod_id):
+        """Registra la producción prod_id en los índices"""
+        non_terminal, production = self.productions[prod_id]
+        self.productions_by_lhs[non_terminal].append(prod_id)
+        self.production_ids.setdefault((non_terminal, tuple(production)), prod_id)
+
+    def get_production_number(self, non_terminal, production):
+        """Retorna el id de la producción non_terminal -> production, o -1 si no existe"""
+        return self.production_ids.get((non_terminal, tuple(production)), -1)
 
     def compute_terminals_and_non_terminals(self):
         """Calcula los terminales y no terminales de la gramática"""
@@ -48,90 +102,28 @@ class Grammar:
         return self.terminals, self.non_terminals
 
     def compute_first(self):
-        """Calcula el conjunto FIRST para cada símbolo"""
-        first = {symbol: set() for symbol in self.non_terminals | self.terminals}
-
-        # FIRST de terminales es el terminal mismo
-        for terminal in self.terminals:
-            first[terminal].add(terminal)
-
-        # Añadir epsilon a FIRST si hay producción epsilon
-        first[self.epsilon] = {self.epsilon}
-
-        # Iterar hasta que no haya cambios
-        changed = True
-        while changed:
-            changed = False
-            for non_terminal, production in self.productions:
-                old_size = len(first[non_terminal])
-
-                if not production or production[0] == self.epsilon:
-                    # Producción epsilon
-                    first[non_terminal].add(self.epsilon)
-                else:
-                    # Procesar la producción
-                    for i, symbol in enumerate(production):
-                        # Añadir FIRST(symbol) - {epsilon} a FIRST(non_terminal)
-                        first[non_terminal] |= first[symbol] - {self.epsilon}
-
-                        # Si epsilon no está en FIRST(symbol), parar
-                        if self.epsilon not in first[symbol]:
-                            break
-
-                        # Si llegamos al final y todos tenían epsilon
-                        if i == len(production) - 1:
-                            first[non_terminal].add(self.epsilon)
-
-                if len(first[non_terminal]) > old_size:
-                    changed = True
+        """
+        Calcula el conjunto FIRST para cada símbolo.
 
-        return first
+        Se resuelve sobre la gramática compilada (bitsets y componentes
+        fuertemente conexas) y se traduce de vuelta a nombres.
+        """
+        compiled = CompiledGrammar(self)
+        first, nullable = compiled.compute_first()
+        return compiled.first_names(first, nullable)
 
     def compute_follow(self, first):
-        """Calcula el conjunto FOLLOW para cada no terminal"""
-        follow = {non_terminal: set() for non_terminal in self.non_terminals}
-
-        # FOLLOW del símbolo inicial contiene $
-        follow[self.start_symbol].add(self.end_marker)
-
-        # Iterar hasta que no haya cambios
-        changed = True
-        while changed:
-            changed = False
-            for non_terminal, production in self.productions:
-                for i, symbol in enumerate(production):
-                    if symbol in self.non_terminals:
-                        old_size = len(follow[symbol])
-
-                        # Calcular FIRST del resto de la producción
-                        rest = production[i + 1 :]
-                        if rest:
-                            first_rest = self._first_of_sequence(rest, first)
-                            follow[symbol] |= first_rest - {self.epsilon}
-
-                            # Si epsilon está en FIRST(rest), añadir FOLLOW(non_terminal)
-                            if self.epsilon in first_rest:
-                                follow[symbol] |= follow[non_terminal]
-                        else:
-                            # Si no hay más símbolos, añadir FOLLOW(non_terminal)
-                            follow[symbol] |= follow[non_terminal]
-
-                        if len(follow[symbol]) > old_size:
-                            changed = True
-
-        return follow
-
-    def _first_of_sequence(self, sequence, first):
-        """Calcula FIRST de una secuencia de símbolos"""
-        result = set()
-        for symbol in sequence:
-            result |= first[symbol] - {self.epsilon}
-            if self.epsilon not in first[symbol]:
-                break
-        else:
-            # Todos los símbolos pueden derivar epsilon
-            result.add(self.epsilon)
-        return result
+        """Calcula el conjunto FOLLOW para cada no terminal a partir de FIRST"""
+        compiled = CompiledGrammar(self)
+        first_bits = [0] * compiled.num_symbols
+        nullable = [False] * compiled.num_symbols
+        for symbol, name in enumerate(compiled.symbols):
+            terminals = first.get(name, ())
+            first_bits[symbol] = to_bits(
+                compiled.symbol_ids[t] for t in terminals if t != self.epsilon
+            )
+            nullable[symbol] = self.epsilon in terminals
+        return compiled.follow_names(compiled.compute_follow(first_bits, nullable))
 
     def print_grammar(self):
         """Imprime la gramática"""
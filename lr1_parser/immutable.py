@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo Immutable
+Define utilidades para congelar las estructuras de un parser ya construido,
+de forma que varias peticiones concurrentes puedan compartirlo sin riesgo.
+"""
+
+
+class FrozenDict(dict):
+    """Diccionario de solo lectura (sigue siendo serializable como dict)"""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("FrozenDict es inmutable")
+
+    __setitem__ = _readonly
+    __delitem__ = _readonly
+    clear = _readonly
+    pop = _readonly
+    popitem = _readonly
+    setdefault = _readonly
+    update = _readonly
+    __ior__ = _readonly
+
+    def __reduce__(self):
+        # pickle no puede usar __setitem__, así que se reconstruye desde un dict
+        return (FrozenDict, (dict(self),))
+
+
+def freeze_sets(mapping):
+    """Convierte un dict de conjuntos en un FrozenDict de frozensets"""
+    return FrozenDict((key, frozenset(value)) for key, value in mapping.items())
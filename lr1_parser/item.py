@@ -8,6 +8,9 @@ Define la clase LR1Item para representar items LR(1).
 class LR1Item:
     """Representa un item LR(1): [A → α·β, a]"""
 
+    # Sin __dict__: los items se crean en gran número al decodificar los estados
+    __slots__ = ("non_terminal", "production", "dot_position", "lookahead")
+
     def __init__(self, non_terminal, production, dot_position, lookahead):
         self.non_terminal = non_terminal
         self.production = tuple(production)
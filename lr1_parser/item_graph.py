@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo ItemGraph
+AFN a nivel de item del autómata (un nodo por item LR(1), aristas de
+desplazamiento y de clausura) calculado una sola vez sobre los ids enteros de
+los estados, sin formatear ni comparar items como cadenas.
+"""
+
+from array import array
+
+from .compiled import iter_bits
+
+
+class ItemGraph:
+    """
+    AFN de items de un autómata construido.
+
+    Un item LR(1) se identifica por núcleo * num_terminals + lookahead. Los
+    nodos son los items distintos de todos los estados, numerados en el orden
+    de sus etiquetas; las aristas son índices de nodo guardados en arrays:
+
+        shift: [A → α . X β, a] --X--> [A → α X . β, a] si el estado del
+            primero tiene transición con X
+        epsilon: de cada item kernel [A → α . B β, a] de un estado a los items
+            de clausura [B → . γ, b] del mismo estado
+
+    Es inmutable: se comparte entre peticiones igual que el parser congelado.
+    """
+
+    def __init__(self, compiled, item_states, transitions):
+        """
+        Args:
+            compiled: CompiledGrammar del parser
+            item_states: Estados como tuplas de (núcleo, bitset de lookaheads)
+            transitions: Dict (estado, símbolo) -> estado, sobre enteros
+        """
+        num_terminals = compiled.num_terminals
+        core_next = compiled.core_next
+        core_dot = compiled.core_dot
+        core_prod = compiled.core_prod
+        prod_lhs = compiled.prod_lhs
+        # El item del símbolo inicial aumentado en el estado 0 es kernel
+        # aunque tenga el punto al principio
+        augmented_start = compiled.start_symbol
+
+        # Items de cada estado como ids enteros; cada núcleo se formatea una vez
+        states = []
+        core_labels = {}
+        item_ids = set()
+        for state in item_states:
+            items = []
+            for core, lookaheads in state:
+                if core not in core_labels:
+                    core_labels[core] = self._core_label(compiled, core)
+                base = core * num_terminals
+                items.extend(base + lookahead for lookahead in iter_bits(lookaheads))
+            states.append(items)
+            item_ids.update(items)
+
+        symbols = compiled.symbols
+        labelled = sorted(
+            (f"{core_labels[item // num_terminals]}, {symbols[item % num_terminals]}", item)
+            for item in item_ids
+        )
+        labels = []
+        node_of = {}
+        for label, item in labelled:
+            # Producciones repetidas dan la misma etiqueta: comparten nodo
+            if not labels or labels[-1] != label:
+                labels.append(label)
+            node_of[item] = len(labels) - 1
+        self.labels = tuple(labels)
+
+        self.shift_src = array("i")
+        self.shift_dst = array("i")
+        self.shift_symbol = array("i")
+        self.epsilon_src = array("i")
+        self.epsilon_dst = array("i")
+        shifts = set()
+        epsilons = set()
+
+        for state_id, items in enumerate(states):
+            kernels = []
+            closure_by_lhs = {}
+            for item in items:
+                core = item // num_terminals
+                node = node_of[item]
+                symbol = core_next[core]
+                if symbol >= 0 and (state_id, symbol) in transitions:
+                    target = node_of.get(item + num_terminals)
+                    if target is not None and (node, target) not in shifts:
+                        shifts.add((node, target))
+                        self.shift_src.append(node)
+                        self.shift_dst.append(target)
+                        self.shift_symbol.append(symbol)
+
+                lhs = prod_lhs[core_prod[core]]
+                if core_dot[core] == 0:
+                    closure_by_lhs.setdefault(lhs, []).append(node)
+                if core_dot[core] > 0 or (state_id == 0 and lhs == augmented_start):
+                    if symbol >= num_terminals:
+                        kernels.append((node, symbol))
+
+            for node, symbol in kernels:
+                for target in closure_by_lhs.get(symbol, ()):
+                    if target != node and (node, target) not in epsilons:
+                        epsilons.add((node, target))
+                        self.epsilon_src.append(node)
+                        self.epsilon_dst.append(target)
+
+    @staticmethod
+    def _core_label(compiled, core):
+        """Formatea un núcleo como: A → α . β (ver LR1Parser._item_label)"""
+        prod_id = compiled.core_prod[core]
+        prod_list = list(compiled.rhs_names[prod_id])
+        prod_list.insert(compiled.core_dot[core], ".")
+        prod_str = " ".join(prod_list) if prod_list != ["."] else "."
+        prod_str = prod_str.replace("ε", "").replace("  ", " ").strip()
+        return f"{compiled.symbols[compiled.prod_lhs[prod_id]]} → {prod_str}"
+
+    @property
+    def num_nodes(self):
+        return len(self.labels)
+
+    @property
+    def num_edges(self):
+        return len(self.shift_src) + len(self.epsilon_src)
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo LALR
+Construcción LALR(1) por propagación de lookaheads sobre el autómata LR(0),
+sin construir antes el autómata LR(1) canónico.
+"""
+
+from collections import defaultdict, deque
+
+from .compiled import iter_bits
+
+
+def lr0_closure(compiled, kernel):
+    """Clausura LR(0) de un kernel de núcleos; retorna los núcleos ordenados"""
+    num_terminals = compiled.num_terminals
+    core_next = compiled.core_next
+    items = list(kernel)
+    seen = set(items)
+    expanded = set()
+
+    for core in items:  # la lista crece mientras se recorre
+        symbol = core_next[core]
+        if symbol >= num_terminals and symbol not in expanded:
+            expanded.add(symbol)
+            for prod_id in compiled.prods_by_lhs[symbol]:
+                new_core = compiled.item_base[prod_id]
+                if new_core not in seen:
+                    seen.add(new_core)
+                    items.append(new_core)
+
+    return sorted(items)
+
+
+def build_lr0_kernels(compiled, budget=None):
+    """
+    Construye el autómata LR(0) identificando cada estado por su kernel.
+
+    Args:
+        compiled: CompiledGrammar
+        budget: BuildBudget opcional al que se carga cada estado nuevo
+
+    Returns:
+        Tupla (kernels, transitions): lista de kernels (tuplas de núcleos) y
+        dict (estado, símbolo) -> estado
+    """
+    core_next = compiled.core_next
+    kernels = [(0,)]
+    if budget is not None:
+        budget.charge(1)
+    state_map = {(0,): 0}
+    transitions = {}
+    unmarked = deque([0])
+
+    while unmarked:
+        current_index = unmarked.popleft()
+
+        targets = defaultdict(list)
+        for core in lr0_closure(compiled, kernels[current_index]):
+            symbol = core_next[core]
+            if symbol >= 0:
+                targets[symbol].append(core + 1)
+
+        for symbol in sorted(targets):
+            kernel = tuple(targets[symbol])
+            goto_index = state_map.get(kernel)
+            if goto_index is None:
+                goto_index = len(kernels)
+                state_map[kernel] = goto_index
+                kernels.append(kernel)
+                if budget is not None:
+                    budget.charge(1)
+                unmarked.append(goto_index)
+            transitions[(current_index, symbol)] = goto_index
+
+    return kernels, transitions
+
+
+def build_lalr_automaton(parser, budget=None):
+    """
+    Construye el autómata LALR(1) para un parser con FIRST ya calculado.
+
+    Los lookaheads se determinan como en el algoritmo del "libro del dragón"
+    (lookaheads espontáneos y propagados), pero con una sola clausura por
+    estado: cada item del kernel recibe un bit "comodín" propio por encima de
+    los terminales, y los bits comodín que llegan a un item indican desde qué
+    items del kernel se propagan sus lookaheads.
+
+    Args:
+        parser: LR1Parser con compiled, FIRST y la tabla de sufijos calculados
+        budget: BuildBudget opcional (estados LR(0) e items de los estados finales)
+
+    Returns:
+        Tupla (item_states, transitions) con el mismo formato que el
+        autómata canónico
+    """
+    compiled = parser.compiled
+    core_next = compiled.core_next
+    num_terminals = compiled.num_terminals
+    terminal_mask = (1 << num_terminals) - 1
+
+    kernels, transitions = build_lr0_kernels(compiled, budget)
+
+    # Lookaheads de cada item del kernel: estado -> {núcleo: bitset}
+    lookaheads = [dict.fromkeys(kernel, 0) for kernel in kernels]
+    lookaheads[0][0] = 1 << compiled.end_marker
+    links = defaultdict(list)  # (estado, núcleo) -> [(estado, núcleo)]
+
+    for state_idx, kernel in enumerate(kernels):
+        dummies = {core: 1 << (num_terminals + i) for i, core in enumerate(kernel)}
+        for core, bits in parser.closure(dummies):
+            symbol = core_next[core]
+            if symbol < 0:
+                continue
+            target = (transitions[(state_idx, symbol)], core + 1)
+
+            # Lookaheads espontáneos: terminales generados dentro del estado
+            lookaheads[target[0]][target[1]] |= bits & terminal_mask
+
+            # Lookaheads propagados: desde cada item del kernel cuyo comodín llegó aquí
+            for i in iter_bits(bits >> num_terminals):
+                links[(state_idx, kernel[i])].append(target)
+
+    # Propagar hasta el punto fijo
+    pending = deque(
+        (state_idx, core)
+        for state_idx, kernel in enumerate(kernels)
+        for core in kernel
+    )
+    queued = set(pending)
+    while pending:
+        source = pending.popleft()
+        queued.discard(source)
+        bits = lookaheads[source[0]][source[1]]
+        for target in links.get(source, ()):
+            old = lookaheads[target[0]][target[1]]
+            merged = old | bits
+            if merged != old:
+                lookaheads[target[0]][target[1]] = merged
+                if target not in queued:
+                    queued.add(target)
+                    pending.append(target)
+
+    # Un item sin lookaheads no existe en LR(1) (gramáticas con símbolos que no
+    # derivan ninguna cadena): se descarta junto con las transiciones que
+    # solo él generaba y los estados que quedan inalcanzables
+    item_states = []
+    for state_lookaheads in lookaheads:
+        kernel = tuple((core, bits) for core, bits in state_lookaheads.items() if bits)
+        item_states.append(parser.closure(kernel) if kernel else ())
+        if budget is not None:
+            budget.charge(items=len(item_states[-1]))
+
+    live_symbols = [{core_next[core] for core, _ in state} for state in item_states]
+    transitions = {
+        (src, symbol): dest
+        for (src, symbol), dest in transitions.items()
+        if symbol in live_symbols[src]
+    }
+    return prune_unreachable(item_states, transitions)
+
+
+def prune_unreachable(item_states, transitions):
+    """Elimina los estados inalcanzables desde el 0 y renumera el resto en orden"""
+    outgoing = defaultdict(list)
+    for (src, symbol), dest in transitions.items():
+        outgoing[src].append(dest)
+
+    reachable = {0}
+    stack = [0]
+    while stack:
+        for dest in outgoing[stack.pop()]:
+            if dest not in reachable:
+                reachable.add(dest)
+                stack.append(dest)
+
+    if len(reachable) == len(item_states):
+        return item_states, transitions
+
+    renumber = {old: new for new, old in enumerate(sorted(reachable))}
+    new_states = [item_states[old] for old in sorted(reachable)]
+    new_transitions = {
+        (renumber[src], symbol): renumber[dest]
+        for (src, symbol), dest in transitions.items()
+        if src in reachable
+    }
+    return new_states, new_transitions
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo BuildLimits
+Límites de construcción del autómata (estados, items, tiempo y memoria) que
+los bucles de construcción comprueban de forma cooperativa.
+"""
+
+import os
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def current_memory():
+    """
+    Memoria residente del proceso (en bytes), o None si no se puede medir.
+    En Linux se lee de /proc; en otros sistemas se usa el pico (ru_maxrss).
+    """
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss está en KB en Linux y en bytes en macOS
+    return peak if os.uname().sysname == "Darwin" else peak * 1024
+
+
+class BuildLimitExceeded(Exception):
+    """
+    La construcción superó uno de sus límites y se abortó.
+
+    Attributes:
+        limit: Nombre del límite superado ("max_states", "max_items",
+            "max_seconds" o "max_memory_mb")
+        stats: Estadísticas parciales de la construcción en el momento de abortar
+    """
+
+    def __init__(self, limit, stats):
+        super().__init__(
+            f"Construcción abortada: se superó {limit}={stats['max']} "
+            f"(fase {stats['phase']}, {stats['states']} estados, {stats['items']} items)"
+        )
+        self.limit = limit
+        self.stats = stats
+
+    def __reduce__(self):
+        # Se envía entre procesos (pool de la API) con sus atributos
+        return (self.__class__, (self.limit, self.stats))
+
+
+class BuildLimits:
+    """
+    Límites de una construcción (None = sin límite).
+
+    Args:
+        max_states: Estados máximos del autómata
+        max_items: Items LR(1) máximos (suma de los items de todos los estados)
+        max_seconds: Tiempo máximo de construcción
+        max_memory_mb: Crecimiento máximo de la memoria del proceso durante la construcción
+    """
+
+    def __init__(self, max_states=None, max_items=None, max_seconds=None, max_memory_mb=None):
+        self.max_states = max_states
+        self.max_items = max_items
+        self.max_seconds = max_seconds
+        self.max_memory_mb = max_memory_mb
+
+    def __repr__(self):
+        return (
+            f"BuildLimits(max_states={self.max_states}, max_items={self.max_items}, "
+            f"max_seconds={self.max_seconds}, max_memory_mb={self.max_memory_mb})"
+        )
+
+
+class BuildBudget:
+    """
+    Contadores de una construcción en curso. Los bucles de construcción llaman
+    a charge() por cada estado o grupo de items nuevo; el tiempo se comprueba en
+    cada llamada y la memoria cada MEMORY_INTERVAL llamadas, porque medirla es
+    más caro.
+    """
+
+    MEMORY_INTERVAL = 64
+
+    def __init__(self, limits=None):
+        limits = limits or BuildLimits()
+        self.limits = limits
+        self.phase = "grammar"
+        self.states = 0
+        self.items = 0
+        self._started = time.monotonic()
+        self._deadline = (
+            self._started + limits.max_seconds if limits.max_seconds else None
+        )
+        self._memory_base = current_memory() if limits.max_memory_mb else None
+        self._memory_peak = 0
+        self._calls = 0
+
+    def enter(self, phase):
+        """Marca el inicio de una fase ("automaton", "table"...) y comprueba los límites."""
+        self.phase = phase
+        self._check_time()
+        self._check_memory()
+
+    def charge(self, states=0, items=0):
+        """Suma estados e items nuevos y aborta si se supera algún límite."""
+        self.states += states
+        self.items += items
+        limits = self.limits
+        if limits.max_states is not None and self.states > limits.max_states:
+            self._abort("max_states", limits.max_states)
+        if limits.max_items is not None and self.items > limits.max_items:
+            self._abort("max_items", limits.max_items)
+        self._check_time()
+        self._calls += 1
+        if self._calls % self.MEMORY_INTERVAL == 0:
+            self._check_memory()
+
+    def _check_time(self):
+        if self._deadline is not None and time.monotonic() > self._deadline:
+            self._abort("max_seconds", self.limits.max_seconds)
+
+    def _check_memory(self):
+        if self._memory_base is None:
+            return
+        memory = current_memory()
+        if memory is None:
+            return
+        self._memory_peak = max(self._memory_peak, memory - self._memory_base)
+        if self._memory_peak > self.limits.max_memory_mb * 1024 * 1024:
+            self._abort("max_memory_mb", self.limits.max_memory_mb)
+
+    def stats(self):
+        """Estadísticas de la construcción hasta el momento."""
+        return {
+            "phase": self.phase,
+            "states": self.states,
+            "items": self.items,
+            "elapsed_seconds": round(time.monotonic() - self._started, 3),
+            "memory_mb": round(self._memory_peak / (1024 * 1024), 1),
+        }
+
+    def _abort(self, limit, maximum):
+        stats = self.stats()
+        stats["max"] = maximum
+        raise BuildLimitExceeded(limit, stats)
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo Pager
+Construcción LR(1) mínima con el criterio de compatibilidad débil de Pager:
+dos estados con el mismo núcleo LR(0) se fusionan solo si la fusión no puede
+introducir conflictos, así que se conserva la potencia de LR(1) con un número
+de estados cercano a LALR(1).
+"""
+
+from collections import defaultdict, deque
+
+from .lalr import prune_unreachable
+
+
+def weakly_compatible(kernel_a, kernel_b):
+    """
+    Test de compatibilidad débil de Pager entre dos kernels con el mismo núcleo.
+
+    Para cada par de items i < j con lookaheads (L_i, L_j) y (L'_i, L'_j), la
+    fusión es segura si (L_i ∩ L'_j) ∪ (L'_i ∩ L_j) es vacío, o si ya había
+    intersección dentro de alguno de los dos kernels (L_i ∩ L_j o L'_i ∩ L'_j).
+
+    Args:
+        kernel_a, kernel_b: Tuplas de lookaheads (bitsets) en el mismo orden de núcleos
+    """
+    size = len(kernel_a)
+    for i in range(size):
+        a_i = kernel_a[i]
+        b_i = kernel_b[i]
+        for j in range(i + 1, size):
+            if (a_i & kernel_b[j]) | (b_i & kernel_a[j]):
+                if not (a_i & kernel_a[j]) and not (b_i & kernel_b[j]):
+                    return False
+    return True
+
+
+def build_pager_automaton(parser, budget=None):
+    """
+    Construye el autómata LR(1) mínimo (Pager, compatibilidad débil).
+
+    Cuando un estado absorbe lookaheads nuevos al fusionarse, se vuelve a
+    procesar para propagarlos a sus sucesores; al final se descartan los
+    estados que hayan quedado inalcanzables y se renumeran los demás.
+
+    Args:
+        parser: LR1Parser con compiled, FIRST y la tabla de sufijos calculados
+        budget: BuildBudget opcional al que se cargan los estados y sus items
+
+    Returns:
+        Tupla (item_states, transitions) con el mismo formato que el
+        autómata canónico
+    """
+    core_next = parser.compiled.core_next
+
+    initial_kernel = {0: 1 << parser.compiled.end_marker}
+    kernels = [initial_kernel]  # núcleo -> bitset, por estado
+    item_states = [None]
+    transitions = {}
+    states_by_core = defaultdict(list)  # núcleos LR(0) del kernel -> estados
+    states_by_core[(0,)].append(0)
+
+    pending = deque([0])
+    queued = {0}
+    if budget is not None:
+        budget.charge(1)
+
+    while pending:
+        current_index = pending.popleft()
+        queued.discard(current_index)
+
+        closure = parser.closure(tuple(kernels[current_index].items()))
+        if budget is not None:
+            # Un estado reprocesado sustituye su clausura anterior
+            budget.charge(items=len(closure) - len(item_states[current_index] or ()))
+        item_states[current_index] = closure
+
+        successors = defaultdict(dict)
+        for core, lookaheads in closure:
+            symbol = core_next[core]
+            if symbol >= 0:
+                successors[symbol][core + 1] = lookaheads
+
+        for symbol in sorted(successors):
+            new_kernel = successors[symbol]
+            cores = tuple(new_kernel)
+            new_lookaheads = tuple(new_kernel.values())
+
+            target = None
+            for candidate in states_by_core[cores]:
+                if weakly_compatible(tuple(kernels[candidate].values()), new_lookaheads):
+                    target = candidate
+                    break
+
+            if target is None:
+                target = len(kernels)
+                kernels.append(dict(new_kernel))
+                item_states.append(None)
+                if budget is not None:
+                    budget.charge(1)
+                states_by_core[cores].append(target)
+                queued.add(target)
+                pending.append(target)
+            else:
+                # Fusionar; si el estado gana lookaheads hay que reprocesarlo
+                target_kernel = kernels[target]
+                changed = False
+                for core, lookaheads in new_kernel.items():
+                    merged = target_kernel[core] | lookaheads
+                    if merged != target_kernel[core]:
+                        target_kernel[core] = merged
+                        changed = True
+                if changed and target not in queued:
+                    queued.add(target)
+                    pending.append(target)
+
+            transitions[(current_index, symbol)] = target
+
+    return prune_unreachable(item_states, transitions)
+
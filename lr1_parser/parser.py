@@ -4,181 +4,452 @@ Módulo LR1Parser
 Define la clase LR1Parser que implementa el análisis sintáctico LR(1).
 """
 
+import hashlib
+import sys
 import graphviz
 from collections import defaultdict, deque
+from collections.abc import Sequence
 from typing import Set, Dict, List, Tuple, FrozenSet
 
 from .item import LR1Item
+from .compiled import CompiledGrammar, iter_bits
+from .lalr import build_lalr_automaton
+from .pager import build_pager_automaton
+from .tables import CompiledTables
+from .compressed import CompressedTables
+from .persist import MappedStates, dumps_parser, load_parser, loads_parser, save_parser
+from .immutable import FrozenDict, freeze_sets
+from .limits import BuildBudget
+from .render import get_render_pool
+from .item_graph import ItemGraph
+
+
+class _DecodedStates(Sequence):
+    """
+    Vista de solo lectura de los estados del autómata como conjuntos de LR1Item.
+    Los items se decodifican de enteros a nombres solo al acceder a cada estado.
+    """
+
+    def __init__(self, compiled, item_states):
+        self._compiled = compiled
+        self._item_states = item_states
+
+    def __len__(self):
+        return len(self._item_states)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        decode = self._compiled.decode_items
+        return frozenset(
+            item
+            for core, lookaheads in self._item_states[index]
+            for item in decode(core, lookaheads)
+        )
 
 
 class LR1Parser:
     """Parser LR(1) completo"""
 
-    def __init__(self, grammar):
+    # Modos de construcción del autómata:
+    #   "lr1"  - LR(1) canónico
+    #   "lalr" - LALR(1) por propagación de lookaheads (mismos estados que LR(0))
+    #   "pager" - LR(1) mínimo: fusiona estados solo si no añade conflictos
+    MODES = ("lr1", "lalr", "pager")
+
+    # Formatos de imagen de render_automaton y render_simplified_automaton
+    RENDER_FORMATS = ("png", "svg")
+
+    def __init__(self, grammar, mode="lr1"):
+        if mode not in self.MODES:
+            raise ValueError(
+                f"Modo de construcción desconocido: {mode!r} (válidos: {', '.join(self.MODES)})"
+            )
         self.grammar = grammar
+        self.mode = mode
+        self.compiled = None
         self.first = {}
         self.follow = {}
-        self.states = []
         self.transitions = {}
         self.parsing_table = {"action": {}, "goto": {}}
+        self.tables = None  # CompiledTables: ACTION/GOTO como matrices de enteros
+        self.compressed_tables = None  # CompressedTables: forma comprimida de tables
+        self._frozen = False
+
+        # Representación interna sobre enteros (ver CompiledGrammar): cada estado
+        # es una tupla ordenada de pares (núcleo LR(0), bitset de lookaheads) y
+        # las transiciones son (estado, símbolo) -> estado
+        self._first = []
+        self._nullable = []
+        self._follow = []
+        self._suffix_first = ()
+        self._suffix_nullable = ()
+        self._item_states = []
+        self._transitions = {}
+        self._action = []  # filas {terminal: acción}, solo durante build_parsing_table
+        self._goto = []
+        self._budget = None  # BuildBudget, solo durante build
+        self._item_graph = None  # ItemGraph, se calcula al pedirlo
+        self._source = None  # buffer del que se cargó (ver persist.loads_parser)
 
         # Aumentar la gramática
         self.augmented_start = self.grammar.start_symbol + "'"
-        self.grammar.productions.insert(
-            0, (self.augmented_start, [self.grammar.start_symbol])
-        )
-        self.grammar.non_terminals.add(self.augmented_start)
-        self.grammar.start_symbol = self.augmented_start
+        self.grammar.augment(self.augmented_start)
+
+    @property
+    def states(self):
+        """Estados del autómata como conjuntos de LR1Item (vista decodificada)"""
+        return _DecodedStates(self.compiled, self._item_states)
+
+    def build(self, limits=None):
+        """
+        Construye el parser LR(1) completo.
+
+        Args:
+            limits: BuildLimits opcional (estados, items, tiempo y memoria). Se
+                comprueban durante la construcción y, si se supera alguno, se
+                lanza BuildLimitExceeded con las estadísticas parciales
+        """
+        self._budget = BuildBudget(limits)
+        try:
+            self._build()
+        finally:
+            self._budget = None
+
+    def _build(self):
+        self._source = None
 
-    def build(self):
-        """Construye el parser LR(1) completo"""
         # Calcular terminales y no terminales
         self.grammar.compute_terminals_and_non_terminals()
 
-        # Calcular FIRST y FOLLOW
-        self.first = self.grammar.compute_first()
-        self.follow = self.grammar.compute_follow(self.first)
+        # Internar los símbolos como enteros
+        self.compiled = CompiledGrammar(self.grammar)
+
+        # Calcular FIRST (bitsets por símbolo)
+        self._first, self._nullable = self.compiled.compute_first()
+
+        # FIRST de cada sufijo β en [A → α . X β], usado por la clausura y FOLLOW
+        self._suffix_first, self._suffix_nullable = self.compiled.compute_suffix_first(
+            self._first, self._nullable
+        )
+
+        # Calcular FOLLOW
+        self._follow = self.compiled.compute_follow(
+            self._first, self._nullable,
+            (self._suffix_first, self._suffix_nullable),
+        )
+        self.first = self.compiled.first_names(self._first, self._nullable)
+        self.follow = self.compiled.follow_names(self._follow)
 
         # Construir el autómata LR(1)
+        self._budget.enter("automaton")
         self.build_automaton()
 
-        # Construir la tabla de parsing
+        # Construir la tabla de parsing y su forma comprimida
+        self._budget.enter("table")
         self.build_parsing_table()
+        self.compressed_tables = CompressedTables(self.tables)
+
+    def __setattr__(self, name, value):
+        if getattr(self, "_frozen", False):
+            raise AttributeError("El parser está congelado y no puede modificarse")
+        super().__setattr__(name, value)
+
+    def freeze(self):
+        """
+        Congela el parser construido (y su gramática) para poder compartirlo
+        entre peticiones concurrentes sin copias.
+        """
+        if self._frozen:
+            return self
+        self.grammar.freeze()
+        self.first = freeze_sets(self.first)
+        self.follow = freeze_sets(self.follow)
+        self._first = tuple(self._first)
+        self._nullable = tuple(self._nullable)
+        self._follow = tuple(self._follow)
+        if not isinstance(self._item_states, MappedStates):
+            self._item_states = tuple(self._item_states)
+        self._transitions = FrozenDict(self._transitions)
+        self.transitions = FrozenDict(self.transitions)
+        # Las vistas de la tabla ya son de solo lectura
+        self.parsing_table = FrozenDict(self.parsing_table)
+        self._frozen = True
+        return self
+
+    def estimate_memory(self):
+        """Estimación aproximada (en bytes) de la memoria que ocupa el parser construido"""
+        pair_size = sys.getsizeof((0, 0))
+        total = sys.getsizeof(self._item_states)
+        if isinstance(self._item_states, MappedStates):
+            # Estados leídos de un archivo mapeado: no se decodifican para medirlos
+            total += self._item_states.nbytes()
+        else:
+            for state in self._item_states:
+                total += sys.getsizeof(state) + len(state) * pair_size
+                total += sum(sys.getsizeof(lookaheads) for _, lookaheads in state)
+
+        total += sys.getsizeof(self._transitions) + sys.getsizeof(self.transitions)
+
+        for sets in (self._first, self._follow):
+            total += sum(sys.getsizeof(value) for value in sets)
+        if self.tables is not None:
+            total += self.tables.nbytes() + self.compressed_tables.nbytes()
+        return total
+
+    def fingerprint(self):
+        """
+        Huella (SHA-256) del autómata: el modo y las producciones por nombre.
+        El autómata es función de ambos, así que sirve de clave para cachear
+        lo que se deriva de él (p. ej. los gráficos renderizados).
+        """
+        compiled = self.compiled
+        symbols = compiled.symbols
+        lines = [self.mode]
+        for lhs, rhs in zip(compiled.prod_lhs, compiled.prod_rhs):
+            lines.append(f"{symbols[lhs]} -> {' '.join(symbols[s] for s in rhs)}")
+        return hashlib.sha256("\n".join(lines).encode("utf-8")).hexdigest()
+
+    def save(self, path):
+        """Guarda el parser construido en un archivo binario (ver persist.py)"""
+        save_parser(self, path)
+
+    def load(self, path):
+        """
+        Carga el estado construido desde un archivo generado con save(), en
+        lugar de llamar a build(). El archivo se mapea en memoria.
+
+        Returns:
+            True si se cargó; False si el archivo no existe, es de otra versión
+            o no corresponde a esta gramática y modo (hay que llamar a build())
+        """
+        return load_parser(self, path)
+
+    def __getstate__(self):
+        """
+        Estado para pickle. Un parser construido se serializa en el formato
+        binario de persist.py: sus estados y tablas pueden ser vistas sobre un
+        archivo mapeado, que no se pueden serializar directamente. Si se cargó
+        de un buffer (p. ej. al recibirlo de otro proceso), se reutiliza ese
+        buffer en lugar de volver a serializarlo.
+        """
+        if self.tables is None:
+            return dict(self.__dict__)
+        return {
+            "grammar": self.grammar,
+            "mode": self.mode,
+            "augmented_start": self.augmented_start,
+            "frozen": self._frozen,
+            "data": dumps_parser(self) if self._source is None else bytes(self._source),
+        }
+
+    def __setstate__(self, state):
+        if "data" not in state:
+            self.__dict__.update(state)
+            return
+
+        # Mismos atributos que __init__, sin volver a aumentar la gramática;
+        # loads_parser rellena el resto desde el buffer
+        self.grammar = state["grammar"]
+        self.mode = state["mode"]
+        self.augmented_start = state["augmented_start"]
+        self.compiled = None
+        self.first = {}
+        self.follow = {}
+        self.transitions = {}
+        self.parsing_table = {"action": {}, "goto": {}}
+        self.tables = None
+        self.compressed_tables = None
+        self._frozen = False
+        self._action = []
+        self._goto = []
+        self._budget = None
+        self._item_graph = None
+        self._source = None
+        if not loads_parser(self, state["data"]):
+            raise ValueError("Estado serializado de LR1Parser inválido")
+        if state["frozen"]:
+            self.freeze()
 
     def closure(self, items):
-        """Calcula la clausura de un conjunto de items LR(1)"""
-        closure_set = set(items)
-        queue = deque(items)
+        """
+        Calcula la clausura de un conjunto de items LR(1).
 
-        while queue:
-            item = queue.popleft()
-            next_sym = item.next_symbol()
-
-            if next_sym and next_sym in self.grammar.non_terminals:
-                # Calcular FIRST de la secuencia después del símbolo
-                rest = list(item.production[item.dot_position + 1 :]) + [item.lookahead]
-                first_rest = self.grammar._first_of_sequence(rest, self.first)
-
-                # Para cada producción de next_sym
-                for non_terminal, production in self.grammar.productions:
-                    if non_terminal == next_sym:
-                        for lookahead in first_rest:
-                            if lookahead != self.grammar.epsilon:
-                                new_item = LR1Item(
-                                    non_terminal, production, 0, lookahead
-                                )
-                                if new_item not in closure_set:
-                                    closure_set.add(new_item)
-                                    queue.append(new_item)
-
-        return frozenset(closure_set)
+        Los items son pares (núcleo, bitset de lookaheads): todos los lookaheads
+        de un mismo núcleo se fusionan en un único entero en lugar de crear un
+        item por lookahead.
 
-    def goto(self, items, symbol):
-        """Calcula GOTO(items, symbol)"""
-        goto_set = set()
+        Returns:
+            Tupla ordenada por núcleo de pares (núcleo, lookaheads)
+        """
+        compiled = self.compiled
+        num_terminals = compiled.num_terminals
+        core_next = compiled.core_next
+        item_base = compiled.item_base
+        suffix_first = self._suffix_first
+        suffix_nullable = self._suffix_nullable
 
-        for item in items:
-            if item.next_symbol() == symbol:
-                goto_set.add(item.advance())
+        closure_items = dict(items)
+        queue = deque(closure_items)
+        queued = set(closure_items)
 
-        if goto_set:
-            return self.closure(goto_set)
-        return frozenset()
+        while queue:
+            core = queue.popleft()
+            queued.discard(core)
+            symbol = core_next[core]
+            if symbol < num_terminals:
+                continue
+
+            # Lookaheads de los items B -> . γ: FIRST(β a) para cada lookahead a,
+            # con FIRST(β) ya precalculado por núcleo
+            new_lookaheads = suffix_first[core]
+            if suffix_nullable[core]:
+                new_lookaheads |= closure_items[core]
+
+            # Para cada producción del no terminal tras el punto
+            for new_prod in compiled.prods_by_lhs[symbol]:
+                new_core = item_base[new_prod]
+                old = closure_items.get(new_core, 0)
+                merged = old | new_lookaheads
+                if merged != old:
+                    closure_items[new_core] = merged
+                    if new_core not in queued:
+                        queued.add(new_core)
+                        queue.append(new_core)
+
+        return tuple(sorted(closure_items.items()))
+
+    def goto(self, items, symbol):
+        """Calcula GOTO(items, symbol) sobre items (núcleo, lookaheads)"""
+        core_next = self.compiled.core_next
+        kernel = {
+            core + 1: lookaheads
+            for core, lookaheads in items
+            if core_next[core] == symbol
+        }
+
+        if kernel:
+            return self.closure(kernel)
+        return ()
 
     def build_automaton(self):
-        """Construye el autómata LR(1)"""
-        # Estado inicial: [S' -> . S, $]
-        initial_item = LR1Item(
-            self.augmented_start,
-            self.grammar.productions[0][1],
-            0,
-            self.grammar.end_marker,
-        )
-        initial_state = self.closure([initial_item])
+        """Construye el autómata según el modo del parser"""
+        budget = self._budget or BuildBudget()
+        if self.mode == "lalr":
+            self._item_states, self._transitions = build_lalr_automaton(self, budget)
+        elif self.mode == "pager":
+            self._item_states, self._transitions = build_pager_automaton(self, budget)
+        else:
+            self._build_canonical_automaton(budget)
 
-        self.states = [initial_state]
-        unmarked = [initial_state]
-        state_map = {initial_state: 0}
+        self._name_transitions()
+        self._item_graph = None
 
-        while unmarked:
-            current_state = unmarked.pop(0)
-            current_index = state_map[current_state]
+    def _name_transitions(self):
+        """Transiciones con nombres para la API y la visualización"""
+        symbols = self.compiled.symbols
+        self.transitions = {
+            (src, symbols[symbol]): dest
+            for (src, symbol), dest in self._transitions.items()
+        }
+
+    def _build_canonical_automaton(self, budget):
+        """
+        Construye el autómata LR(1) canónico.
 
-            # Obtener todos los símbolos posibles después del punto
-            symbols = set()
-            for item in current_state:
-                next_sym = item.next_symbol()
-                if next_sym:
-                    symbols.add(next_sym)
+        Cada estado queda identificado por su kernel: el GOTO de un estado se
+        agrupa por símbolo en una sola pasada y la clausura solo se calcula
+        cuando el kernel resultante no existe todavía.
+        """
+        core_next = self.compiled.core_next
 
-            # Para cada símbolo, calcular GOTO
-            for symbol in symbols:
-                goto_state = self.goto(current_state, symbol)
+        # Estado inicial: [S' -> . S, $]
+        initial_kernel = ((0, 1 << self.compiled.end_marker),)
 
-                if goto_state:
-                    if goto_state not in state_map:
-                        state_map[goto_state] = len(self.states)
-                        self.states.append(goto_state)
-                        unmarked.append(goto_state)
+        self._item_states = [self.closure(initial_kernel)]
+        budget.charge(1, len(self._item_states[0]))
+        self._transitions = {}
+        state_map = {initial_kernel: 0}  # kernel -> índice de estado
+        unmarked = deque([0])
 
-                    goto_index = state_map[goto_state]
-                    self.transitions[(current_index, symbol)] = goto_index
+        while unmarked:
+            current_index = unmarked.popleft()
+
+            # Kernels de GOTO(estado, X) para cada símbolo X tras el punto
+            kernels = defaultdict(dict)
+            for core, lookaheads in self._item_states[current_index]:
+                symbol = core_next[core]
+                if symbol >= 0:
+                    kernels[symbol][core + 1] = lookaheads
+
+            # Para cada símbolo (en orden de id, para numerar los estados
+            # siempre igual), buscar o crear el estado destino
+            for symbol in sorted(kernels):
+                # Los estados están ordenados por núcleo, así que el kernel también
+                kernel = tuple(kernels[symbol].items())
+                goto_index = state_map.get(kernel)
+
+                if goto_index is None:
+                    goto_index = len(self._item_states)
+                    state_map[kernel] = goto_index
+                    self._item_states.append(self.closure(kernel))
+                    budget.charge(1, len(self._item_states[goto_index]))
+                    unmarked.append(goto_index)
+
+                self._transitions[(current_index, symbol)] = goto_index
 
     def build_parsing_table(self):
         """Construye la tabla de parsing LR(1)"""
-        for state_idx, state in enumerate(self.states):
-            for item in state:
-                if item.next_symbol() is None:
+        compiled = self.compiled
+        self._action = [{} for _ in self._item_states]
+        self._goto = [{} for _ in self._item_states]
+
+        for state_idx, state in enumerate(self._item_states):
+            for core, lookaheads in state:
+                next_sym = compiled.core_next[core]
+                if next_sym < 0:
                     # Item de reducción
-                    if item.non_terminal == self.augmented_start:
-                        # Aceptar
+                    prod_id = compiled.core_prod[core]
+                    if prod_id == 0:
+                        # Aceptar: S' -> S .
                         self._add_action(
-                            state_idx, self.grammar.end_marker, ("accept", None)
+                            state_idx, compiled.end_marker, ("accept", None)
                         )
                     else:
-                        # Reducir
-                        prod_num = self._find_production_number(
-                            item.non_terminal, item.production
-                        )
-                        self._add_action(
-                            state_idx, item.lookahead, ("reduce", prod_num)
-                        )
-                else:
-                    next_sym = item.next_symbol()
-                    if next_sym in self.grammar.terminals:
-                        # Desplazar
-                        if (state_idx, next_sym) in self.transitions:
-                            next_state = self.transitions[(state_idx, next_sym)]
-                            self._add_action(state_idx, next_sym, ("shift", next_state))
-
-            # GOTO para no terminales
-            for non_terminal in self.grammar.non_terminals:
-                if (state_idx, non_terminal) in self.transitions:
-                    next_state = self.transitions[(state_idx, non_terminal)]
-                    if state_idx not in self.parsing_table["goto"]:
-                        self.parsing_table["goto"][state_idx] = {}
-                    self.parsing_table["goto"][state_idx][non_terminal] = next_state
+                        # Reducir (una entrada por lookahead del núcleo)
+                        for lookahead in iter_bits(lookaheads):
+                            self._add_action(state_idx, lookahead, ("reduce", prod_id))
+                elif next_sym < compiled.num_terminals:
+                    # Desplazar
+                    next_state = self._transitions.get((state_idx, next_sym))
+                    if next_state is not None:
+                        self._add_action(state_idx, next_sym, ("shift", next_state))
+
+        # GOTO para no terminales
+        for (state_idx, symbol), next_state in self._transitions.items():
+            if symbol >= compiled.num_terminals:
+                self._goto[state_idx][symbol] = next_state
+
+        # Matrices de enteros; parsing_table es una vista con nombres sobre ellas
+        # y las filas con dicts solo eran necesarias para construirlas
+        self.tables = CompiledTables(self)
+        self.parsing_table = self.tables.named_view()
+        self._action = []
+        self._goto = []
 
     def _add_action(self, state, terminal, action):
-        """Añade una acción a la tabla de parsing"""
-        if state not in self.parsing_table["action"]:
-            self.parsing_table["action"][state] = {}
+        """Añade una acción a la tabla de parsing (terminal como id)"""
+        row = self._action[state]
 
-        if terminal in self.parsing_table["action"][state]:
-            existing = self.parsing_table["action"][state][terminal]
+        if terminal in row:
+            existing = row[terminal]
             if existing != action:
-                print(f"[WARNING] CONFLICTO en estado {state}, terminal '{terminal}':")
+                name = self.compiled.symbols[terminal]
+                print(f"[WARNING] CONFLICTO en estado {state}, terminal '{name}':")
                 print(f"   Acción existente: {existing}")
                 print(f"   Nueva acción: {action}")
         else:
-            self.parsing_table["action"][state][terminal] = action
-
-    def _find_production_number(self, non_terminal, production):
-        """Encuentra el número de producción"""
-        for idx, (nt, prod) in enumerate(self.grammar.productions):
-            if nt == non_terminal and tuple(prod) == production:
-                return idx
-        return -1
+            row[terminal] = action
 
     def print_automaton(self):
         """Imprime el autómata LR(1)"""
@@ -370,9 +641,98 @@ class LR1Parser:
         
         return compact
 
-    def visualize_automaton(self, filename="automaton_lr1"):
+    def render_automaton(self, format="png", pool=None):
         """
-        Genera el AFD: todos los items (kernel + clausura) agrupados por estado.
+        Renderiza el AFD (ver automaton_graph) y retorna la imagen como bytes.
+
+        La imagen sale directamente de la tubería de Graphviz, sin archivos
+        temporales, así que se puede llamar desde varias peticiones a la vez.
+        El proceso `dot` se lanza a través de un RenderPool (por defecto el de
+        render.get_render_pool()), que limita los renders simultáneos.
+
+        Args:
+            format: Formato de salida, uno de RENDER_FORMATS ("png" o "svg")
+            pool: RenderPool opcional
+
+        Raises:
+            RenderPoolSaturated o RenderTimeout (ver RenderPool.render)
+        """
+        return self._render(self.automaton_graph(), format, pool)
+
+    def render_simplified_automaton(self, format="png", pool=None):
+        """Renderiza el AFN (ver simplified_automaton_graph) y retorna la imagen como bytes."""
+        return self._render(self.simplified_automaton_graph(), format, pool)
+
+    def _render(self, dot, format, pool):
+        if format not in self.RENDER_FORMATS:
+            raise ValueError(
+                f"Formato de imagen desconocido: {format!r} (válidos: {', '.join(self.RENDER_FORMATS)})"
+            )
+        return (pool or get_render_pool()).render(dot.source, format)
+
+    def visualize_automaton(self, filename="automaton_lr1", format="png"):
+        """
+        Genera el AFD: todos los items (kernel + clausura) agrupados por estado,
+        y lo guarda como '<filename>.<format>'.
+        """
+        try:
+            self._write_image(f"{filename}.{format}", self.render_automaton(format))
+            print(f"\n[OK] AFD (Todos los items: kernel + clausura) guardado como '{filename}.{format}'")
+        except Exception as e:
+            print(f"\n[WARNING] No se pudo generar el grafico: {e}")
+            print(
+                "   Asegurate de tener Graphviz instalado: https://graphviz.org/download/"
+            )
+
+    def visualize_simplified_automaton(self, filename="automaton_lr1_simplified", format="png"):
+        """
+        Genera el AFN: todos los items (kernel + clausura) con transiciones item
+        a item, y lo guarda como '<filename>_kernel.<format>'.
+        """
+        try:
+            output_filename = f"{filename}_kernel.{format}"
+            self._write_image(output_filename, self.render_simplified_automaton(format))
+            print(f"[OK] AFN (Clausura completa) guardado como '{output_filename}'")
+        except Exception as e:
+            print(f"[WARNING] No se pudo generar el grafico: {e}")
+
+    @staticmethod
+    def _write_image(path, data):
+        with open(path, "wb") as f:
+            f.write(data)
+
+    @staticmethod
+    def _item_label(item):
+        """Formatea un item como: A → α . β, a (sin corchetes)"""
+        prod_list = list(item.production)
+        prod_list.insert(item.dot_position, ".")
+        prod_str = " ".join(prod_list) if prod_list != ["."] else "."
+        prod_str = prod_str.replace("ε", "").replace("  ", " ").strip()
+        return f"{item.non_terminal} → {prod_str}, {item.lookahead}"
+
+    def automaton_graph_data(self):
+        """
+        Grafo del AFD como datos: todos los items (kernel + clausura) agrupados
+        por estado, sin pasar por Graphviz.
+
+        Returns:
+            Dict {"nodes": [{"id", "items"}], "edges": [{"source", "target", "label"}]}
+        """
+        nodes = []
+        for idx, state in enumerate(self.states):
+            items = [self._item_label(item) for item in state]
+            if items:
+                nodes.append({"id": str(idx), "items": items})
+
+        edges = [
+            {"source": str(src), "target": str(dest), "label": symbol}
+            for (src, symbol), dest in self.transitions.items()
+        ]
+        return {"nodes": nodes, "edges": edges}
+
+    def automaton_graph(self):
+        """
+        Grafo Graphviz del AFD: todos los items (kernel + clausura) agrupados por estado.
         """
         dot = graphviz.Digraph(comment="Autómata LR(1) - AFD (Todos los Items)")
         dot.attr(rankdir="LR")  # Left to Right
@@ -383,49 +743,60 @@ class LR1Parser:
         dot.attr(ranksep="1.0")
         dot.attr(nodesep="0.8")
         
-        # Crear estados con TODOS los items (kernel + clausura)
-        for idx, state in enumerate(self.states):
-            # Recolectar TODOS los items del estado
-            all_items = []
-            
-            for item in state:
-                # Construir el item SIN corchetes
-                prod_list = list(item.production)
-                prod_list.insert(item.dot_position, ".")
-                
-                # Formatear producción
-                prod_str = " ".join(prod_list) if prod_list != ["."] else "."
-                prod_str = prod_str.replace("ε", "").replace("  ", " ").strip()
-                if prod_str == ".":
-                    prod_str = "."
-                
-                # Formatear como: A → α . β, a (SIN corchetes)
-                item_formatted = f"{item.non_terminal} → {prod_str}, {item.lookahead}"
-                all_items.append(item_formatted)
-            
-            # Crear el nodo con todos los items
-            if all_items:
-                label = "\\n".join(all_items)
-                # Usar forma elíptica para estados
-                dot.node(str(idx), label, shape="ellipse", style="solid", penwidth="1.5")
+        data = self.automaton_graph_data()
+
+        # Un nodo elíptico por estado con TODOS sus items (kernel + clausura)
+        for node in data["nodes"]:
+            label = "\\n".join(node["items"])
+            dot.node(node["id"], label, shape="ellipse", style="solid", penwidth="1.5")
         
         # Añadir transiciones entre estados
-        for (src, symbol), dest in self.transitions.items():
-            dot.edge(str(src), str(dest), label=f" {symbol} ", fontsize="11", penwidth="1.2")
+        for edge in data["edges"]:
+            dot.edge(edge["source"], edge["target"], label=f" {edge['label']} ", fontsize="11", penwidth="1.2")
 
-        # Guardar
-        try:
-            dot.render(filename, format="png", cleanup=True)
-            print(f"\n[OK] AFD (Todos los items: kernel + clausura) guardado como '{filename}.png'")
-        except Exception as e:
-            print(f"\n[WARNING] No se pudo generar el grafico: {e}")
-            print(
-                "   Asegurate de tener Graphviz instalado: https://graphviz.org/download/"
-            )
+        return dot
+
+    def item_graph(self):
+        """
+        AFN a nivel de item (ver ItemGraph). Se calcula la primera vez que se
+        pide y se reutiliza para el render y la exportación del AFN.
+        """
+        graph = self._item_graph
+        if graph is None:
+            graph = ItemGraph(self.compiled, self._item_states, self._transitions)
+            # Derivado e inmutable: se guarda también en un parser congelado
+            object.__setattr__(self, "_item_graph", graph)
+        return graph
+
+    def simplified_automaton_graph_data(self):
+        """
+        Grafo del AFN como datos: un nodo por item (kernel + clausura), con
+        aristas de desplazamiento ("shift") y de clausura ("epsilon").
+
+        Returns:
+            Dict {"nodes": [{"id", "label"}], "edges": [{"source", "target", "label", "kind"}]}
+        """
+        graph = self.item_graph()
+        symbols = self.compiled.symbols
+        node_ids = [f"n{idx}" for idx in range(graph.num_nodes)]
+
+        nodes = [
+            {"id": node_id, "label": label}
+            for node_id, label in zip(node_ids, graph.labels)
+        ]
+        edges = [
+            {"source": node_ids[src], "target": node_ids[dst], "label": symbols[symbol], "kind": "shift"}
+            for src, dst, symbol in zip(graph.shift_src, graph.shift_dst, graph.shift_symbol)
+        ]
+        edges.extend(
+            {"source": node_ids[src], "target": node_ids[dst], "label": "ε", "kind": "epsilon"}
+            for src, dst in zip(graph.epsilon_src, graph.epsilon_dst)
+        )
+        return {"nodes": nodes, "edges": edges}
 
-    def visualize_simplified_automaton(self, filename="automaton_lr1_simplified"):
+    def simplified_automaton_graph(self):
         """
-        Genera el AFN: todos los items (kernel + clausura) con transiciones item a item.
+        Grafo Graphviz del AFN: todos los items (kernel + clausura) con transiciones item a item.
         """
         dot = graphviz.Digraph(comment="Autómata LR(1) - AFN (Clausura Completa)")
         dot.attr(rankdir="LR")  # Left to Right para mejor visualización
@@ -436,116 +807,18 @@ class LR1Parser:
         dot.attr(ranksep="0.8")
         dot.attr(nodesep="0.5")
         
-        # Mapeo de item_str -> node_id (sin distinguir por estado para evitar duplicados)
-        node_map = {}
-        node_counter = 0
+        data = self.simplified_automaton_graph_data()
 
-        # Primero, recolectar todos los items únicos
-        all_items_set = set()
-        for idx, state in enumerate(self.states):
-            for item in state:
-                # Construir el item sin corchetes
-                prod_list = list(item.production)
-                prod_list.insert(item.dot_position, ".")
-                
-                # Formatear producción
-                prod_str = " ".join(prod_list) if prod_list != ["."] else "."
-                prod_str = prod_str.replace("ε", "").replace("  ", " ").strip()
-                if prod_str == ".":
-                    prod_str = "."
-                
-                # Formatear como: A → α . β, a (SIN corchetes)
-                item_str = f"{item.non_terminal} → {prod_str}, {item.lookahead}"
-                all_items_set.add(item_str)
-        
-        # Crear nodos para cada item único
-        for item_str in sorted(all_items_set):
-            node_id = f"n{node_counter}"
-            node_map[item_str] = node_id
-            node_counter += 1
+        for node in data["nodes"]:
             # Label sin corchetes
-            dot.node(node_id, item_str, shape="ellipse")
+            dot.node(node["id"], node["label"], shape="ellipse")
 
-        # Crear transiciones entre items basadas en las transiciones del autómata
-        edges_added = set()  # Para evitar aristas duplicadas
-        
-        for (src_state, symbol), dest_state in self.transitions.items():
-            # Para cada item en el estado origen
-            for src_item in self.states[src_state]:
-                # Solo si el item tiene el símbolo después del punto
-                if src_item.next_symbol() == symbol:
-                    # El item avanzado
-                    advanced_item = src_item.advance()
-                    
-                    # Construir representaciones sin corchetes
-                    prod_list_src = list(src_item.production)
-                    prod_list_src.insert(src_item.dot_position, ".")
-                    prod_str_src = " ".join(prod_list_src) if prod_list_src != ["."] else "."
-                    prod_str_src = prod_str_src.replace("ε", "").replace("  ", " ").strip()
-                    src_item_str = f"{src_item.non_terminal} → {prod_str_src}, {src_item.lookahead}"
-                    
-                    prod_list_adv = list(advanced_item.production)
-                    prod_list_adv.insert(advanced_item.dot_position, ".")
-                    prod_str_adv = " ".join(prod_list_adv) if prod_list_adv != ["."] else "."
-                    prod_str_adv = prod_str_adv.replace("ε", "").replace("  ", " ").strip()
-                    adv_item_str = f"{advanced_item.non_terminal} → {prod_str_adv}, {advanced_item.lookahead}"
-                    
-                    # Crear arista si ambos items existen
-                    if src_item_str in node_map and adv_item_str in node_map:
-                        edge_key = (src_item_str, adv_item_str, symbol)
-                        if edge_key not in edges_added:
-                            dot.edge(node_map[src_item_str], node_map[adv_item_str], 
-                                   label=symbol, fontsize="10")
-                            edges_added.add(edge_key)
-        
-        # Añadir transiciones epsilon (clausura) dentro de cada estado
-        for idx, state in enumerate(self.states):
-            items_list = list(state)
-            # Identificar items kernel en este estado
-            kernel_items = []
-            for item in items_list:
-                is_kernel = (
-                    item.dot_position > 0 or 
-                    (idx == 0 and item.non_terminal == self.augmented_start)
-                )
-                if is_kernel:
-                    kernel_items.append(item)
-            
-            # Desde cada item kernel, crear aristas epsilon a items de clausura
-            for kernel_item in kernel_items:
-                # Formatear kernel item
-                prod_list_k = list(kernel_item.production)
-                prod_list_k.insert(kernel_item.dot_position, ".")
-                prod_str_k = " ".join(prod_list_k) if prod_list_k != ["."] else "."
-                prod_str_k = prod_str_k.replace("ε", "").replace("  ", " ").strip()
-                kernel_str = f"{kernel_item.non_terminal} → {prod_str_k}, {kernel_item.lookahead}"
-                
-                # Para cada item de clausura en este estado
-                for closure_item in items_list:
-                    if closure_item.dot_position == 0 and closure_item != kernel_item:
-                        # Este es un item de clausura
-                        prod_list_c = list(closure_item.production)
-                        prod_list_c.insert(closure_item.dot_position, ".")
-                        prod_str_c = " ".join(prod_list_c) if prod_list_c != ["."] else "."
-                        prod_str_c = prod_str_c.replace("ε", "").replace("  ", " ").strip()
-                        closure_str = f"{closure_item.non_terminal} → {prod_str_c}, {closure_item.lookahead}"
-                        
-                        # Verificar si debe haber una transición epsilon
-                        next_sym = kernel_item.next_symbol()
-                        if next_sym and next_sym in self.grammar.non_terminals:
-                            if closure_item.non_terminal == next_sym:
-                                # Hay una relación de clausura
-                                edge_key = (kernel_str, closure_str, "ε")
-                                if edge_key not in edges_added:
-                                    if kernel_str in node_map and closure_str in node_map:
-                                        dot.edge(node_map[kernel_str], node_map[closure_str], 
-                                               label="ε", fontsize="9", style="dashed", color="gray")
-                                        edges_added.add(edge_key)
-
-        # Guardar
-        try:
-            output_filename = f"{filename}_kernel"
-            dot.render(output_filename, format="png", cleanup=True)
-            print(f"[OK] AFN (Clausura completa) guardado como '{output_filename}.png'")
-        except Exception as e:
-            print(f"[WARNING] No se pudo generar el grafico: {e}")
+        for edge in data["edges"]:
+            if edge["kind"] == "epsilon":
+                dot.edge(edge["source"], edge["target"],
+                       label="ε", fontsize="9", style="dashed", color="gray")
+            else:
+                dot.edge(edge["source"], edge["target"],
+                       label=edge["label"], fontsize="10")
+
+        return dot
@@ -0,0 +1,458 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo Persist
+Define el formato binario con el que se guarda en disco un parser ya construido
+(estados, transiciones, FIRST/FOLLOW y tablas) y la caché en directorio que lo
+recupera mapeando el archivo en memoria, sin volver a construir el autómata.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+from collections.abc import Sequence
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin bloqueos, la limpieza queda para el operador
+    fcntl = None
+
+from ._version import __version__
+from .compiled import CompiledGrammar
+from .compressed import CompressedTables
+from .tables import CompiledTables
+
+MAGIC = b"LR1T"
+FORMAT_VERSION = 1
+
+# Módulos de los que dependen los estados y las tablas guardados: su código
+# forma parte de la revisión, así que cambiar la construcción invalida los
+# archivos aunque no se actualice __version__
+_CONSTRUCTION_MODULES = (
+    "grammar.py", "compiled.py", "parser.py", "lalr.py", "pager.py",
+    "tables.py", "compressed.py", "persist.py",
+)
+
+
+def _code_revision():
+    digest = hashlib.sha256()
+    package = os.path.dirname(os.path.abspath(__file__))
+    for name in _CONSTRUCTION_MODULES:
+        try:
+            with open(os.path.join(package, name), "rb") as f:
+                digest.update(f.read())
+        except OSError:
+            # Instalación sin fuentes: solo cuentan __version__ y FORMAT_VERSION
+            continue
+    return digest.hexdigest()[:12]
+
+
+CODE_REVISION = _code_revision()
+
+# Cabecera: magic, versión del formato y longitud de los metadatos (JSON)
+_HEADER = struct.Struct("<4sII")
+_ALIGNMENT = 8
+
+
+def _align(offset):
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+class MappedStates(Sequence):
+    """
+    Estados del autómata sobre buffers mapeados: cada estado se decodifica a su
+    tupla de pares (núcleo, bitset de lookaheads) solo cuando se accede a él.
+    """
+
+    def __init__(self, offsets, cores, lookaheads, width):
+        """
+        Args:
+            offsets: Enteros; los items del estado i son [offsets[i], offsets[i+1])
+            cores: Núcleo LR(0) de cada item
+            lookaheads: Bytes con el bitset de cada item (width bytes, little endian)
+            width: Bytes por bitset
+        """
+        self._offsets = offsets
+        self._cores = cores
+        self._lookaheads = lookaheads
+        self._width = width
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("índice de estado fuera de rango")
+
+        width = self._width
+        lookaheads = self._lookaheads
+        return tuple(
+            (
+                self._cores[item],
+                int.from_bytes(lookaheads[item * width:(item + 1) * width], "little"),
+            )
+            for item in range(self._offsets[index], self._offsets[index + 1])
+        )
+
+    def nbytes(self):
+        """Bytes de los buffers (mapeados, no ocupan memoria propia del proceso)"""
+        return sum(
+            buffer.itemsize * len(buffer) if hasattr(buffer, "itemsize") else len(buffer)
+            for buffer in (self._offsets, self._cores, self._lookaheads)
+        )
+
+
+def _encode_bitsets(bitsets, width):
+    return b"".join(bits.to_bytes(width, "little") for bits in bitsets)
+
+
+def _decode_bitsets(buffer, width):
+    return [
+        int.from_bytes(buffer[start:start + width], "little")
+        for start in range(0, len(buffer), width)
+    ]
+
+
+def dumps_parser(parser):
+    """
+    Serializa un parser construido al formato binario.
+
+    Formato: cabecera fija, metadatos JSON (versiones, modo, símbolos y la
+    posición de cada sección) y secciones binarias alineadas a 8 bytes con los
+    arrays de enteros (int32 nativos) o bytes crudos.
+
+    Returns:
+        bytes con el contenido del archivo
+    """
+    compiled = parser.compiled
+    width = max(1, (compiled.num_terminals + 7) // 8)
+
+    offsets = array("i", [0])
+    cores = array("i")
+    lookaheads = bytearray()
+    for state in parser._item_states:
+        for core, bits in state:
+            cores.append(core)
+            lookaheads += bits.to_bytes(width, "little")
+        offsets.append(len(cores))
+
+    transitions = parser._transitions
+    sections = {
+        "first": _encode_bitsets(parser._first, width),
+        "nullable": bytes(bytearray(parser._nullable)),
+        "follow": _encode_bitsets(parser._follow, width),
+        "state_offsets": offsets,
+        "item_cores": cores,
+        "item_lookaheads": lookaheads,
+        "transition_src": array("i", (src for src, _ in transitions)),
+        "transition_symbol": array("i", (symbol for _, symbol in transitions)),
+        "transition_dest": array("i", transitions.values()),
+        "action": parser.tables.action,
+        "goto": parser.tables.goto,
+    }
+    for name in CompressedTables.ARRAYS:
+        sections[name] = getattr(parser.compressed_tables, name)
+
+    meta = {
+        "package_version": __version__,
+        "code_revision": CODE_REVISION,
+        "byteorder": sys.byteorder,
+        "mode": parser.mode,
+        "fingerprint": parser.fingerprint(),
+        "symbols": list(compiled.symbols),
+        "num_productions": compiled.num_productions,
+        "num_states": len(parser._item_states),
+        "num_action_rows": parser.compressed_tables.num_action_rows,
+        "width": width,
+        "sections": {},
+    }
+    payload = []
+    offset = 0
+    for name, data in sections.items():
+        view = memoryview(data)
+        typecode = "B" if view.format in ("B", "b", "c") else view.format
+        raw = view.tobytes()
+        meta["sections"][name] = [offset, len(raw), typecode]
+        payload.append((offset, raw))
+        offset = _align(offset + len(raw))
+
+    meta_bytes = json.dumps(meta).encode("utf-8")
+    data_start = _align(_HEADER.size + len(meta_bytes))
+
+    data = bytearray(data_start + offset)
+    _HEADER.pack_into(data, 0, MAGIC, FORMAT_VERSION, len(meta_bytes))
+    data[_HEADER.size:_HEADER.size + len(meta_bytes)] = meta_bytes
+    for section_offset, raw in payload:
+        start = data_start + section_offset
+        data[start:start + len(raw)] = raw
+    return bytes(data)
+
+
+def save_parser(parser, path):
+    """Guarda un parser construido en `path` (escritura atómica, ver dumps_parser)."""
+    data = dumps_parser(parser)
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def load_parser(parser, path):
+    """
+    Rellena un LR1Parser recién creado con el estado guardado en `path`.
+
+    El archivo se mapea en memoria: los estados y las tablas (densas y
+    comprimidas, y la vista parsing_table sobre ellas) se leen directamente del
+    mapa; solo las transiciones con nombres se reconstruyen como dict.
+
+    Returns:
+        True si se cargó; False si el archivo no existe, está corrupto, es de
+        otra versión del paquete (o de otra revisión del código de construcción)
+        o no corresponde a la gramática y modo del parser
+    """
+    try:
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return False
+
+    return loads_parser(parser, mapped)
+
+
+def loads_parser(parser, data):
+    """
+    Rellena un LR1Parser recién creado desde un buffer en el formato de
+    dumps_parser (bytes o un archivo mapeado). Los estados y las tablas quedan
+    como vistas sobre el buffer, sin copiarlo.
+
+    Returns:
+        True si se cargó; False en los mismos casos que load_parser
+    """
+    buffer = memoryview(data)
+    try:
+        magic, format_version, meta_size = _HEADER.unpack_from(buffer)
+        if magic != MAGIC or format_version != FORMAT_VERSION:
+            return False
+        meta = json.loads(bytes(buffer[_HEADER.size:_HEADER.size + meta_size]))
+    except (struct.error, ValueError):
+        return False
+
+    if (
+        not isinstance(meta, dict)
+        or meta.get("package_version") != __version__
+        or meta.get("code_revision") != CODE_REVISION
+        or meta.get("byteorder") != sys.byteorder
+        or meta.get("mode") != parser.mode
+    ):
+        return False
+
+    grammar = parser.grammar
+    if not getattr(grammar, "_frozen", False):
+        # Una gramática congelada ya tiene calculados (e inmutables) sus símbolos
+        grammar.compute_terminals_and_non_terminals()
+    compiled = CompiledGrammar(grammar)
+    if (
+        list(compiled.symbols) != meta.get("symbols")
+        or compiled.num_productions != meta.get("num_productions")
+    ):
+        return False
+    # Mismos símbolos y número de producciones no bastan (S -> a b frente a
+    # S -> b a): la huella compara las producciones una a una
+    parser.compiled = compiled
+    if parser.fingerprint() != meta.get("fingerprint"):
+        return False
+
+    try:
+        _fill_parser(parser, compiled, meta, buffer, _align(_HEADER.size + meta_size))
+    except (KeyError, TypeError, ValueError, IndexError):
+        # Archivo truncado o inconsistente: el llamador reconstruye con build()
+        return False
+    # Las vistas ya mantienen vivo el buffer: guardarlo permite reenviar el
+    # parser sin volver a serializarlo (ver LR1Parser.__getstate__)
+    parser._source = data
+    return True
+
+
+def _fill_parser(parser, compiled, meta, buffer, data_start):
+    """Asigna al parser los datos de las secciones de un archivo ya validado"""
+
+    def section(name):
+        offset, size, typecode = meta["sections"][name]
+        if data_start + offset + size > len(buffer):
+            raise ValueError(f"sección {name} fuera del archivo")
+        view = buffer[data_start + offset:data_start + offset + size]
+        return view if typecode == "B" else view.cast(typecode)
+
+    width = meta["width"]
+    num_states = meta["num_states"]
+
+    parser.compiled = compiled
+    parser._first = _decode_bitsets(section("first"), width)
+    parser._nullable = [bool(value) for value in section("nullable")]
+    parser._follow = _decode_bitsets(section("follow"), width)
+    parser._suffix_first, parser._suffix_nullable = compiled.compute_suffix_first(
+        parser._first, parser._nullable
+    )
+    parser.first = compiled.first_names(parser._first, parser._nullable)
+    parser.follow = compiled.follow_names(parser._follow)
+
+    parser._item_states = MappedStates(
+        section("state_offsets"), section("item_cores"),
+        section("item_lookaheads"), width,
+    )
+    parser._transitions = dict(zip(
+        zip(section("transition_src"), section("transition_symbol")),
+        section("transition_dest"),
+    ))
+    parser._name_transitions()
+    parser._item_graph = None
+
+    parser.tables = CompiledTables.from_buffers(
+        compiled, num_states, section("action"), section("goto")
+    )
+    parser.compressed_tables = CompressedTables.from_buffers(
+        parser.tables, meta["num_action_rows"],
+        {name: section(name) for name in CompressedTables.ARRAYS},
+    )
+    parser.parsing_table = parser.tables.named_view()
+
+
+class TableCache:
+    """
+    Caché persistente de parsers construidos en un directorio, indexada por la
+    huella de la gramática.
+
+    Los archivos viven en un subdirectorio por versión del paquete, del
+    formato y revisión del código de construcción (CODE_REVISION), así que
+    una versión nueva, o un cambio en la construcción, no reutiliza tablas
+    antiguas.
+
+    Mientras la caché existe mantiene un bloqueo compartido sobre el archivo
+    .lock de su subdirectorio. Al abrirla se eliminan los subdirectorios de
+    otras versiones cuyo .lock no tiene ningún bloqueo: en un despliegue
+    gradual, los procesos de la versión anterior siguen usando el suyo hasta
+    terminar. Los subdirectorios sin .lock (o sin fcntl, en Windows) no se
+    tocan: su limpieza queda para el operador.
+    """
+
+    LOCK_NAME = ".lock"
+
+    def __init__(self, directory):
+        self.root = directory
+        self.directory = os.path.join(
+            directory, f"v{__version__}-f{FORMAT_VERSION}-r{CODE_REVISION}"
+        )
+        self._lock = self._lock_directory()
+        self._remove_stale_versions()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    def _lock_directory(self):
+        """Crea el subdirectorio y toma el bloqueo compartido de su .lock."""
+        while True:
+            os.makedirs(self.directory, exist_ok=True)
+            if fcntl is None:
+                return None
+            path = os.path.join(self.directory, self.LOCK_NAME)
+            lock = open(path, "ab")
+            fcntl.flock(lock, fcntl.LOCK_SH)
+            try:
+                if os.path.samestat(os.fstat(lock.fileno()), os.stat(path)):
+                    return lock
+            except OSError:
+                pass
+            # Otro proceso eliminó el directorio antes de que se tomara el
+            # bloqueo: se vuelve a crear
+            lock.close()
+
+    def _remove_stale_versions(self):
+        if fcntl is None:
+            return
+        current = os.path.basename(self.directory)
+        for name in os.listdir(self.root):
+            stale = os.path.join(self.root, name)
+            if name == current or not name.startswith("v") or "-f" not in name or not os.path.isdir(stale):
+                continue
+            try:
+                lock = open(os.path.join(stale, self.LOCK_NAME), "rb")
+            except OSError:
+                continue
+            with lock:
+                try:
+                    fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    continue  # algún proceso de esa versión lo está usando
+                shutil.rmtree(stale, ignore_errors=True)
+
+    def close(self):
+        """Libera el bloqueo del subdirectorio (ya no cuenta como en uso)."""
+        if self._lock is not None:
+            self._lock.close()
+            self._lock = None
+
+    def path(self, key):
+        """Ruta del archivo de un parser"""
+        return os.path.join(self.directory, f"{key}.lr1")
+
+    def load(self, key, parser):
+        """Carga en `parser` (recién creado) el estado guardado; retorna si lo logró"""
+        if load_parser(parser, self.path(key)):
+            self.hits += 1
+            return True
+        self.misses += 1
+        return False
+
+    def save(self, key, parser):
+        """
+        Guarda un parser construido; un error de disco no interrumpe el servicio.
+
+        Returns:
+            True si el archivo quedó escrito
+        """
+        try:
+            save_parser(parser, self.path(key))
+        except OSError as e:
+            print(f"[WARNING] No se pudo guardar el parser en disco: {e}")
+            return False
+        self.writes += 1
+        return True
+
+    def share(self, key, parser):
+        """
+        Guarda un parser recién construido y cambia sus tablas y estados por la
+        copia mapeada del archivo: todos los procesos que mapean el mismo
+        archivo comparten sus páginas físicas en lugar de tener cada uno su
+        copia en objetos Python.
+
+        Returns:
+            True si el parser quedó respaldado por el archivo compartido
+        """
+        return self.save(key, parser) and load_parser(parser, self.path(key))
+
+    def stats(self):
+        """Retorna las estadísticas de uso de la caché en disco."""
+        files = [name for name in os.listdir(self.directory) if name.endswith(".lr1")]
+        return {
+            "directory": self.directory,
+            "files": len(files),
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+        }
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo RenderPool
+Pool acotado de procesos de Graphviz (`dot`) para renderizar los grafos del
+autómata: limita cuántos renders se ejecutan y esperan a la vez, y cuánto
+puede tardar cada uno.
+"""
+
+import subprocess
+import threading
+import time
+
+import graphviz
+
+
+class RenderPoolSaturated(RuntimeError):
+    """El pool ya tiene todos sus procesos ocupados y la cola llena."""
+
+
+class RenderTimeout(TimeoutError):
+    """El render (incluida la espera en la cola) superó el tiempo máximo."""
+
+
+class RenderPool:
+    """
+    Limita los procesos `dot` que se ejecutan a la vez.
+
+    Como máximo `max_workers` renders se ejecutan y `max_queue` esperan turno;
+    una petición más se rechaza en el acto con RenderPoolSaturated en lugar de
+    lanzar otro proceso. Cada render (espera incluida) tiene `timeout`
+    segundos; al agotarse, el proceso `dot` se termina y se lanza RenderTimeout.
+
+    Es seguro usarlo desde varios hilos: cada render es un proceso `dot`
+    independiente que recibe el DOT por stdin y devuelve la imagen por stdout.
+    """
+
+    def __init__(self, max_workers=2, max_queue=8, timeout=30, engine="dot"):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.engine = engine
+        self._slots = threading.BoundedSemaphore(max_workers)
+        self._lock = threading.Lock()
+        self._pending = 0  # renders en ejecución o en cola
+        self._running = 0
+        self.renders = 0
+        self.rejected = 0
+        self.timeouts = 0
+
+    def render(self, source, format):
+        """
+        Renderiza un grafo en formato DOT y retorna la imagen como bytes.
+
+        Raises:
+            RenderPoolSaturated si no quedan procesos ni sitio en la cola
+            RenderTimeout si se supera el tiempo máximo
+            graphviz.ExecutableNotFound si Graphviz no está instalado
+            graphviz.CalledProcessError si `dot` falla
+        """
+        deadline = time.monotonic() + self.timeout if self.timeout else None
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise RenderPoolSaturated(
+                    f"Pool de render saturado ({self.max_workers} procesos, cola de {self.max_queue})"
+                )
+            self._pending += 1
+
+        try:
+            if not self._slots.acquire(timeout=self._remaining(deadline)):
+                self._timed_out()
+            with self._lock:
+                self._running += 1
+            try:
+                return self._run(source, format, deadline)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                self._slots.release()
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def _run(self, source, format, deadline):
+        cmd = [self.engine, f"-T{format}"]
+        try:
+            proc = subprocess.run(
+                cmd,
+                input=source.encode("utf-8"),
+                capture_output=True,
+                timeout=self._remaining(deadline),
+            )
+        except FileNotFoundError:
+            raise graphviz.ExecutableNotFound(cmd)
+        except subprocess.TimeoutExpired:
+            # subprocess.run ya terminó el proceso
+            self._timed_out()
+
+        if proc.returncode:
+            raise graphviz.CalledProcessError(
+                proc.returncode, cmd, output=proc.stdout, stderr=proc.stderr
+            )
+        with self._lock:
+            self.renders += 1
+        return proc.stdout
+
+    @staticmethod
+    def _remaining(deadline):
+        if deadline is None:
+            return None
+        return max(deadline - time.monotonic(), 0)
+
+    def _timed_out(self):
+        with self._lock:
+            self.timeouts += 1
+        raise RenderTimeout(f"El render superó {self.timeout} s")
+
+    def stats(self):
+        """Retorna el estado y los contadores del pool."""
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "timeout": self.timeout,
+                "running": self._running,
+                "queued": self._pending - self._running,
+                "renders": self.renders,
+                "rejected": self.rejected,
+                "timeouts": self.timeouts,
+            }
+
+
+_default_pool = RenderPool()
+
+
+def get_render_pool():
+    """Pool que usan por defecto los métodos render_* y visualize_* de LR1Parser."""
+    return _default_pool
+
+
+def set_render_pool(pool):
+    """Sustituye el pool por defecto (p. ej. con los límites de la configuración)."""
+    global _default_pool
+    _default_pool = pool
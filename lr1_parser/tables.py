@@ -0,0 +1,326 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo CompiledTables
+Define las tablas ACTION/GOTO compiladas a matrices densas de enteros y el
+driver de reconocimiento que trabaja directamente sobre ellas.
+"""
+
+from array import array
+from collections.abc import Mapping
+
+
+class CompiledTables:
+    """
+    Tablas ACTION y GOTO como matrices densas (arrays de enteros con signo).
+
+    ACTION se indexa por `estado * num_terminals + terminal` y codifica:
+        0   error
+        +k  desplazar al estado k - 1
+        -k  reducir por la producción k - 1 (reducir por la 0, S' -> S, es aceptar)
+
+    GOTO se indexa por `estado * num_non_terminals + (no_terminal - num_terminals)`
+    y guarda el estado destino o -1 si no hay transición.
+    """
+
+    def __init__(self, parser):
+        """
+        Compila las tablas de un parser ya construido.
+
+        Args:
+            parser: LR1Parser tras build_parsing_table
+        """
+        self._init_grammar(parser.compiled, len(parser._action))
+
+        self.action = array("i", bytes(4 * self.num_states * self.num_terminals))
+        for state_idx, row in enumerate(parser._action):
+            offset = state_idx * self.num_terminals
+            for terminal, (action_type, value) in row.items():
+                self.action[offset + terminal] = self.encode_action(action_type, value)
+
+        self.goto = array("i", [-1]) * (self.num_states * self.num_non_terminals)
+        for state_idx, row in enumerate(parser._goto):
+            offset = state_idx * self.num_non_terminals - self.num_terminals
+            for non_terminal, next_state in row.items():
+                self.goto[offset + non_terminal] = next_state
+
+    def _init_grammar(self, compiled, num_states):
+        self.symbols = compiled.symbols
+        self.symbol_ids = compiled.symbol_ids
+        self.num_states = num_states
+        self.num_terminals = compiled.num_terminals
+        self.num_non_terminals = compiled.num_symbols - compiled.num_terminals
+        self.prod_lhs = array("i", compiled.prod_lhs)
+        self.prod_len = array("i", (len(rhs) for rhs in compiled.prod_rhs))
+
+    @classmethod
+    def from_buffers(cls, compiled, num_states, action, goto):
+        """
+        Reconstruye las tablas sobre matrices ya codificadas (arrays o
+        memoryviews de enteros, p. ej. sobre un archivo mapeado en memoria).
+        """
+        tables = cls.__new__(cls)
+        tables._init_grammar(compiled, num_states)
+        tables.action = action
+        tables.goto = goto
+        return tables
+
+    @staticmethod
+    def encode_action(action_type, value):
+        """Codifica una acción ("shift"/"reduce"/"accept", valor) como entero"""
+        if action_type == "shift":
+            return value + 1
+        if action_type == "reduce":
+            return -(value + 1)
+        if action_type == "accept":
+            return -1
+        raise ValueError(f"Acción desconocida: {action_type}")
+
+    @staticmethod
+    def decode_action(entry):
+        """Decodifica un entero de ACTION como (tipo, valor), o None si es error"""
+        if entry > 0:
+            return ("shift", entry - 1)
+        if entry == -1:
+            return ("accept", None)
+        if entry < 0:
+            return ("reduce", -entry - 1)
+        return None
+
+    def named_view(self):
+        """
+        Vista {"action": ..., "goto": ...} con nombres de símbolos, en el mismo
+        formato que LR1Parser.parsing_table, leída directamente de las matrices.
+        """
+        return {"action": ActionTableView(self), "goto": GotoTableView(self)}
+
+    def nbytes(self):
+        """Memoria ocupada por las matrices (en bytes)"""
+        return sum(
+            table.itemsize * len(table)
+            for table in (self.action, self.goto, self.prod_lhs, self.prod_len)
+        )
+
+    def encode_tokens(self, tokens):
+        """
+        Convierte nombres de tokens en ids de terminales y añade el marcador de fin.
+        Los tokens que no son terminales de la gramática se codifican como -1.
+        """
+        num_terminals = self.num_terminals
+        ids = []
+        for token in tokens:
+            symbol = self.symbol_ids.get(token, -1)
+            # "$" explícito o un no terminal no son entradas válidas
+            ids.append(symbol if 0 < symbol < num_terminals else -1)
+        ids.append(0)
+        return ids
+
+    def recognize(self, token_ids, build_tree=False, max_steps=None):
+        """
+        Reconoce una secuencia de ids de terminales (terminada en 0, "$").
+
+        El bucle solo hace aritmética sobre enteros y accesos a las matrices;
+        el árbol de derivación se construye únicamente si se pide.
+
+        Args:
+            token_ids: Lista de ids (ver encode_tokens)
+            build_tree: Si es True, construye el árbol de derivación
+            max_steps: Límite de pasos; por defecto (tokens + 1) * (estados + 1).
+                Solo las tablas con conflictos (p. ej. gramáticas cíclicas) pueden
+                reducir sin fin, así que el límite no afecta a tablas LR(1) válidas
+
+        Returns:
+            Tupla (aceptada, posición, árbol): posición es el índice del token
+            donde se detectó el error (o el del "$" si se acepta); el árbol es
+            (símbolo, hijos) con hojas (token, ()), o None
+        """
+        action = self.action
+        goto = self.goto
+        prod_lhs = self.prod_lhs
+        prod_len = self.prod_len
+        symbols = self.symbols
+        num_terminals = self.num_terminals
+        num_non_terminals = self.num_non_terminals
+
+        if max_steps is None:
+            max_steps = (len(token_ids) + 1) * (self.num_states + 1)
+
+        stack = [0]
+        nodes = [] if build_tree else None
+        position = 0
+        token = token_ids[0]
+        state = 0
+
+        for _ in range(max_steps):
+            if token < 0:
+                return False, position, None
+            entry = action[state * num_terminals + token]
+
+            if entry > 0:
+                state = entry - 1
+                stack.append(state)
+                if build_tree:
+                    nodes.append((symbols[token], ()))
+                position += 1
+                token = token_ids[position]
+
+            elif entry < 0:
+                prod_id = -entry - 1
+                if prod_id == 0:
+                    return True, position, nodes[0] if build_tree else None
+
+                length = prod_len[prod_id]
+                lhs = prod_lhs[prod_id]
+                if length:
+                    del stack[-length:]
+                    if build_tree:
+                        children = tuple(nodes[-length:])
+                        del nodes[-length:]
+                if build_tree:
+                    nodes.append((symbols[lhs], children if length else ()))
+
+                state = goto[stack[-1] * num_non_terminals + lhs - num_terminals]
+                if state < 0:
+                    return False, position, None
+                stack.append(state)
+
+            else:
+                return False, position, None
+
+        return False, position, None
+
+
+class ActionTableView(Mapping):
+    """
+    Vista de solo lectura {estado: {terminal: (tipo, valor)}} sobre la matriz
+    ACTION. Como la tabla con dicts, solo contiene los estados con entradas.
+    """
+
+    def __init__(self, tables):
+        self._tables = tables
+        self._states = None
+
+    def _non_empty_states(self):
+        # Se calcula una vez, en el primer acceso, recorriendo la matriz
+        if self._states is None:
+            width = self._tables.num_terminals
+            action = self._tables.action
+            self._states = frozenset(
+                state for state in range(self._tables.num_states)
+                if any(action[state * width:(state + 1) * width])
+            )
+        return self._states
+
+    def __contains__(self, state):
+        return state in self._non_empty_states()
+
+    def __getitem__(self, state):
+        if state not in self._non_empty_states():
+            raise KeyError(state)
+        return ActionRowView(self._tables, state)
+
+    def __iter__(self):
+        return iter(sorted(self._non_empty_states()))
+
+    def __len__(self):
+        return len(self._non_empty_states())
+
+
+class ActionRowView(Mapping):
+    """Vista de solo lectura {terminal: (tipo, valor)} de un estado de ACTION"""
+
+    def __init__(self, tables, state):
+        self._tables = tables
+        self._offset = state * tables.num_terminals
+
+    def _entry(self, terminal):
+        tables = self._tables
+        symbol = tables.symbol_ids.get(terminal, -1)
+        if not 0 <= symbol < tables.num_terminals:
+            return 0
+        return tables.action[self._offset + symbol]
+
+    def __contains__(self, terminal):
+        return self._entry(terminal) != 0
+
+    def __getitem__(self, terminal):
+        entry = self._entry(terminal)
+        if not entry:
+            raise KeyError(terminal)
+        return self._tables.decode_action(entry)
+
+    def __iter__(self):
+        tables = self._tables
+        row = tables.action[self._offset:self._offset + tables.num_terminals]
+        for symbol, entry in enumerate(row):
+            if entry:
+                yield tables.symbols[symbol]
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+class GotoTableView(Mapping):
+    """Vista de solo lectura {estado: {no terminal: estado}} sobre la matriz GOTO"""
+
+    def __init__(self, tables):
+        self._tables = tables
+        self._states = None
+
+    def _non_empty_states(self):
+        if self._states is None:
+            width = self._tables.num_non_terminals
+            goto = self._tables.goto
+            self._states = frozenset(
+                state for state in range(self._tables.num_states)
+                if max(goto[state * width:(state + 1) * width], default=-1) >= 0
+            )
+        return self._states
+
+    def __contains__(self, state):
+        return state in self._non_empty_states()
+
+    def __getitem__(self, state):
+        if state not in self._non_empty_states():
+            raise KeyError(state)
+        return GotoRowView(self._tables, state)
+
+    def __iter__(self):
+        return iter(sorted(self._non_empty_states()))
+
+    def __len__(self):
+        return len(self._non_empty_states())
+
+
+class GotoRowView(Mapping):
+    """Vista de solo lectura {no terminal: estado} de un estado de GOTO"""
+
+    def __init__(self, tables, state):
+        self._tables = tables
+        self._offset = state * tables.num_non_terminals - tables.num_terminals
+
+    def _entry(self, non_terminal):
+        tables = self._tables
+        symbol = tables.symbol_ids.get(non_terminal, -1)
+        if symbol < tables.num_terminals:
+            return -1
+        return tables.goto[self._offset + symbol]
+
+    def __contains__(self, non_terminal):
+        return self._entry(non_terminal) >= 0
+
+    def __getitem__(self, non_terminal):
+        next_state = self._entry(non_terminal)
+        if next_state < 0:
+            raise KeyError(non_terminal)
+        return next_state
+
+    def __iter__(self):
+        tables = self._tables
+        start = self._offset + tables.num_terminals
+        row = tables.goto[start:start + tables.num_non_terminals]
+        for column, next_state in enumerate(row):
+            if next_state >= 0:
+                yield tables.symbols[tables.num_terminals + column]
+
+    def __len__(self):
+        return sum(1 for _ in self)
@@ -4,11 +4,17 @@ Backend FastAPI para el Parser LR(1)
 Proporciona endpoints REST para procesar gramáticas desde el frontend
 """
 
-from fastapi import FastAPI, HTTPException
+import asyncio
+from concurrent.futures.process import BrokenProcessPool
+
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Literal, Optional
 import api_helper
+from lr1_parser import BuildLimitExceeded, __version__ as lr1_version
 
 app = FastAPI(
     title="Parser LR(1) API",
@@ -34,28 +40,127 @@ class GrammarRequest(BaseModel):
     """
     Modelo para el request de procesamiento de gramática.
     
+    El campo `mode` elige la construcción del autómata: "lr1" (canónico),
+    "lalr" (LALR(1), con muchos menos estados) o "pager" (LR(1) mínimo:
+    potencia de LR(1) con un número de estados cercano a LALR).
+    `graph_format` elige el formato de los gráficos ("png" o "svg").
+    
     Ejemplo:
         {
             "grammar": "S -> C C\nC -> c C\nC -> d",
-            "generate_graphs": false
+            "generate_graphs": false,
+            "mode": "lr1"
         }
     """
     grammar: str
     generate_graphs: Optional[bool] = False
+    mode: Literal["lr1", "lalr", "pager"] = "lr1"
+    graph_format: Literal["png", "svg"] = "png"
 
 
 class ParseStringRequest(BaseModel):
     """
     Modelo para el request de parsing de una cadena.
     
+    Con `compressed` en true el parsing usa las tablas comprimidas.
+    
+    El campo `trace` elige el detalle de cada paso: "full" (pila, pila de
+    símbolos y entrada restante), "summary" (solo estado, token y acción),
+    "delta" (como "summary", más el cambio de la pila y la posición en la
+    entrada) o "none" (sin pasos, solo el resultado).
+    
     Ejemplo:
         {
             "grammar": "S -> C C\nC -> c C\nC -> d",
-            "input_string": "c c d d"
+            "input_string": "c c d d",
+            "mode": "lr1",
+            "trace": "summary"
+        }
+    """
+    grammar: str
+    input_string: str
+    mode: Literal["lr1", "lalr", "pager"] = "lr1"
+    compressed: bool = False
+    trace: Literal["none", "summary", "delta", "full"] = "full"
+
+
+class BatchParseRequest(BaseModel):
+    """
+    Modelo para el request de parsing por lotes: varias cadenas con una gramática.
+    
+    Por defecto (`trace` = "none") solo se retorna la aceptación y la posición
+    del error de cada cadena; los niveles de traza son los de ParseStringRequest.
+    
+    Ejemplo:
+        {
+            "grammar": "S -> C C\nC -> c C\nC -> d",
+            "input_strings": ["c c d d", "d d", "c c"],
+            "mode": "lr1"
+        }
+    """
+    grammar: str
+    input_strings: List[str]
+    mode: Literal["lr1", "lalr", "pager"] = "lr1"
+    compressed: bool = False
+    trace: Literal["none", "summary", "delta", "full"] = "none"
+
+
+class GrammarParseRequest(BaseModel):
+    """
+    Modelo para parsear una cadena con una gramática registrada
+    (/grammars/{id}/parse). Mismos campos que ParseStringRequest sin la gramática.
+    """
+    input_string: str
+    compressed: bool = False
+    trace: Literal["none", "summary", "delta", "full"] = "full"
+
+
+class GrammarBatchRequest(BaseModel):
+    """Modelo para parsear un lote de cadenas con una gramática registrada."""
+    input_strings: List[str]
+    compressed: bool = False
+    trace: Literal["none", "summary", "delta", "full"] = "none"
+
+
+class GrammarRecognizeRequest(BaseModel):
+    """Modelo para reconocer una cadena con una gramática registrada."""
+    input_string: str
+    build_tree: bool = False
+    compressed: bool = False
+
+
+class RecognizeRequest(BaseModel):
+    """
+    Modelo para el request de reconocimiento de una cadena (sin traza de pasos).
+    
+    Ejemplo:
+        {
+            "grammar": "S -> C C\nC -> c C\nC -> d",
+            "input_string": "c c d d",
+            "build_tree": true
         }
     """
     grammar: str
     input_string: str
+    build_tree: bool = False
+    mode: Literal["lr1", "lalr", "pager"] = "lr1"
+    compressed: bool = False
+
+
+class GraphStreamRequest(BaseModel):
+    """
+    Modelo para los grafos en streaming: una variante del autómata, "afd"
+    (items agrupados por estado) o "afn" (transiciones item a item).
+    
+    Ejemplo:
+        {
+            "grammar": "S -> C C\nC -> c C\nC -> d",
+            "variant": "afn"
+        }
+    """
+    grammar: str
+    mode: Literal["lr1", "lalr", "pager"] = "lr1"
+    variant: Literal["afd", "afn"] = "afd"
 
 
 # ============================================================================
@@ -63,7 +168,7 @@ class ParseStringRequest(BaseModel):
 # ============================================================================
 
 @app.get("/")
-def root():
+async def root():
     """Endpoint raíz con información de la API."""
     return {
         "message": "Parser LR(1) API",
@@ -75,15 +180,23 @@ def root():
             "/parse/first-follow": "POST - Solo FIRST y FOLLOW",
             "/parse/automaton": "POST - Solo autómata",
             "/parse/table": "POST - Solo tabla de parsing",
+            "/parse/table/compressed": "POST - Tabla de parsing comprimida y estadísticas",
             "/parse/closure": "POST - Solo tabla de clausura",
             "/parse/string": "POST - Parsear una cadena de entrada",
+            "/parse/string/stream": "POST - Parsear una cadena emitiendo los pasos como NDJSON",
+            "/parse/strings": "POST - Parsear un lote de cadenas con una misma gramática",
+            "/parse/recognize": "POST - Reconocer una cadena (aceptación y árbol, sin traza)",
+            "/grammars": "POST - Registrar una gramática compilada (retorna su id)",
+            "/grammars/{id}/{vista}": "GET - Vista de una gramática registrada (con ETag)",
+            "/grammars/{id}/parse": "POST - Parsear una cadena con una gramática registrada",
+            "/cache/stats": "GET - Estadísticas de la caché de parsers",
             "/health": "GET - Estado del servidor"
         }
     }
 
 
 @app.get("/health")
-def health_check():
+async def health_check():
     """Endpoint de health check."""
     import shutil
     
@@ -98,8 +211,106 @@ def health_check():
     }
 
 
+@app.get("/cache/stats")
+async def cache_stats():
+    """Retorna las estadísticas (aciertos, fallos, expulsiones) de la caché de parsers."""
+    return {
+        "success": True,
+        "data": api_helper.obtener_estadisticas_cache()
+    }
+
+
+# La construcción y el parsing son CPU intensivos: los endpoints son asíncronos
+# y delegan ese trabajo al pool de procesos de api_helper, de modo que una
+# gramática grande no bloquea las demás peticiones (ni /health). El parser se
+# obtiene una sola vez en este proceso (_compilar: caché con construcciones
+# single-flight) y las tareas del pool lo reciben ya compilado.
+
+async def _esperar(tarea):
+    """
+    Espera una corrutina de api_helper traduciendo sus errores a HTTP:
+    400 gramática inválida, 422 límites de construcción superados, 504 tiempo
+    agotado, 503 proceso de trabajo caído o pool de render saturado y 500 el resto.
+    """
+    try:
+        return await tarea
+    
+    except api_helper.GramaticaInvalida as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except BuildLimitExceeded as e:
+        raise HTTPException(
+            status_code=422,
+            detail={
+                "error": "build_limit_exceeded",
+                "message": str(e),
+                "limit": e.limit,
+                "stats": e.stats
+            }
+        )
+    except (asyncio.TimeoutError, api_helper.RenderTimeout):
+        raise HTTPException(status_code=504, detail="Tiempo de procesamiento agotado")
+    except api_helper.RenderPoolSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "2"})
+    except BrokenProcessPool:
+        raise HTTPException(
+            status_code=503,
+            detail="El proceso de trabajo terminó inesperadamente, reintenta la petición",
+            headers={"Retry-After": "1"}
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
+
+
+async def _responder_con_parser(funcion, texto_gramatica, mode, parser, *args):
+    """
+    Ejecuta en el pool una función de api_helper que recibe el parser ya
+    compilado (el de la caché o el de una gramática registrada) y envuelve su
+    resultado en {"success": True, "data": ...}. La tarea recibe el parser por
+    referencia (ver api_helper.ejecutar_con_parser) en lugar de reconstruirlo.
+    """
+    return {
+        "success": True,
+        "data": await _esperar(api_helper.ejecutar_con_parser(funcion, texto_gramatica, mode, parser, *args))
+    }
+
+
+async def _compilar(texto_gramatica, mode):
+    """
+    Obtiene el par (grammar, parser) de la caché o lo construye en el pool.
+    
+    Raises:
+        HTTPException 400 si la gramática no es válida (ver _esperar para el resto)
+    """
+    grammar, parser = await _esperar(api_helper.parsear_gramatica_async(texto_gramatica, mode))
+    
+    if grammar is None:
+        raise HTTPException(status_code=400, detail="Error al parsear gramática")
+    
+    return grammar, parser
+
+
+def _registrada(grammar_id):
+    """
+    Obtiene la entrada de una gramática registrada.
+    
+    Raises:
+        HTTPException 404 si el id no está registrado o se expulsó por inactividad
+    """
+    entrada = api_helper.obtener_gramatica_registrada(grammar_id)
+    
+    if entrada is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Gramática '{grammar_id}' no registrada: regístrala con POST /grammars"
+        )
+    
+    return entrada
+
+
 @app.post("/parse")
-def parse_grammar(request: GrammarRequest):
+async def parse_grammar(request: GrammarRequest):
     """
     Procesa una gramática y retorna TODA la información.
     
@@ -116,187 +327,197 @@ def parse_grammar(request: GrammarRequest):
             "generate_graphs": false
         }
     """
-    try:
-        resultado = api_helper.procesar_gramatica_completo(
-            request.grammar,
-            generar_graficos=request.generate_graphs
+    # Una sola construcción (compartida por las peticiones simultáneas con la
+    # misma gramática): los datos y los gráficos salen del mismo parser
+    _, parser = await _compilar(request.grammar, request.mode)
+    datos = await _esperar(api_helper.ejecutar_con_parser(
+        api_helper.datos_gramatica_completos, request.grammar, request.mode, parser
+    ))
+    if request.generate_graphs:
+        datos["graphs"] = await _graficos(
+            request.grammar, request.mode, request.graph_format, parser=parser
         )
-        
-        if not resultado["success"]:
-            raise HTTPException(status_code=400, detail=resultado["error"])
-        
-        return resultado
-    
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
+    return {"success": True, "error": None, "data": datos}
+
+
+async def _graficos(texto_gramatica, mode, formato, parser=None):
+    """
+    Gráficos en base64 de una gramática. Se renderizan en el proceso principal
+    (ver api_helper.generar_graficos_async), con el parser de la caché.
+    """
+    if parser is None:
+        _, parser = await _compilar(texto_gramatica, mode)
+    return await _esperar(api_helper.generar_graficos_async(parser, formato))
+
+
+async def _vista(request, vista):
+    """Responde una vista (ver api_helper.VISTAS) de la gramática del request."""
+    _, parser = await _compilar(request.grammar, request.mode)
+    return await _responder_con_parser(api_helper.calcular_vista, request.grammar, request.mode, parser, vista)
 
 
 @app.post("/parse/productions")
-def parse_productions(request: GrammarRequest):
+async def parse_productions(request: GrammarRequest):
     """
     Parsea una gramática y retorna solo las producciones.
     
     Returns:
         JSON con las producciones
     """
-    try:
-        grammar, parser = api_helper.parsear_gramatica(request.grammar)
-        
-        if grammar is None:
-            raise HTTPException(status_code=400, detail="Error al parsear gramática")
-        
-        return {
-            "success": True,
-            "data": {
-                "productions": api_helper.obtener_producciones_json(grammar),
-                "num_productions": len(grammar.productions)
-            }
-        }
-    
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
+    return await _vista(request, "productions")
 
 
 @app.post("/parse/symbols")
-def parse_symbols(request: GrammarRequest):
+async def parse_symbols(request: GrammarRequest):
     """
     Parsea una gramática y retorna solo los símbolos (terminales y no terminales).
     
     Returns:
         JSON con terminales y no terminales
     """
-    try:
-        grammar, parser = api_helper.parsear_gramatica(request.grammar)
-        
-        if grammar is None:
-            raise HTTPException(status_code=400, detail="Error al parsear gramática")
-        
-        return {
-            "success": True,
-            "data": api_helper.obtener_simbolos_json(grammar, parser)
-        }
-    
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
+    return await _vista(request, "symbols")
 
 
 @app.post("/parse/first-follow")
-def parse_first_follow(request: GrammarRequest):
+async def parse_first_follow(request: GrammarRequest):
     """
     Parsea una gramática y retorna los conjuntos FIRST y FOLLOW.
     
     Returns:
         JSON con FIRST y FOLLOW
     """
-    try:
-        grammar, parser = api_helper.parsear_gramatica(request.grammar)
-        
-        if grammar is None:
-            raise HTTPException(status_code=400, detail="Error al parsear gramática")
-        
-        return {
-            "success": True,
-            "data": api_helper.obtener_first_follow_json(grammar, parser)
-        }
-    
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
+    return await _vista(request, "first-follow")
 
 
 @app.post("/parse/automaton")
-def parse_automaton(request: GrammarRequest):
+async def parse_automaton(request: GrammarRequest):
     """
     Parsea una gramática y retorna el autómata LR(1).
     
     Returns:
         JSON con estados y transiciones del autómata
     """
-    try:
-        grammar, parser = api_helper.parsear_gramatica(request.grammar)
-        
-        if grammar is None:
-            raise HTTPException(status_code=400, detail="Error al parsear gramática")
-        
-        return {
-            "success": True,
-            "data": api_helper.obtener_automata_json(parser)
-        }
-    
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
+    return await _vista(request, "automaton")
 
 
 @app.post("/parse/table")
-def parse_table(request: GrammarRequest):
+async def parse_table(request: GrammarRequest):
     """
     Parsea una gramática y retorna la tabla de parsing (ACTION y GOTO).
     
     Returns:
         JSON con la tabla de parsing
     """
-    try:
-        grammar, parser = api_helper.parsear_gramatica(request.grammar)
-        
-        if grammar is None:
-            raise HTTPException(status_code=400, detail="Error al parsear gramática")
-        
-        return {
-            "success": True,
-            "data": api_helper.obtener_tabla_parsing_json(grammar, parser)
-        }
+    return await _vista(request, "table")
+
+
+@app.post("/parse/table/compressed")
+async def parse_table_compressed(request: GrammarRequest):
+    """
+    Parsea una gramática y retorna la tabla de parsing comprimida (reducciones
+    por defecto, filas compartidas y empaquetado por desplazamiento) junto con
+    la razón de compresión y la latencia de consulta de cada forma de la tabla.
     
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
+    Returns:
+        JSON con los arrays de la tabla comprimida y sus estadísticas
+    """
+    return await _vista(request, "table/compressed")
 
 
 @app.post("/parse/closure")
-def parse_closure(request: GrammarRequest):
+async def parse_closure(request: GrammarRequest):
     """
     Parsea una gramática y retorna la tabla de clausura.
     
     Returns:
         JSON con la tabla de clausura
     """
-    try:
-        grammar, parser = api_helper.parsear_gramatica(request.grammar)
-        
-        if grammar is None:
-            raise HTTPException(status_code=400, detail="Error al parsear gramática")
-        
-        return {
-            "success": True,
-            "data": api_helper.obtener_tabla_clausura_json(parser)
-        }
-    
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
+    return await _vista(request, "closure")
 
 
 @app.post("/parse/graphs")
-def parse_graphs(request: GrammarRequest):
+async def parse_graphs(request: GrammarRequest):
     """
     Parsea una gramática y retorna los gráficos en base64.
     
     Returns:
-        JSON con imágenes en base64
+        JSON con imágenes en base64 (PNG o SVG según `graph_format`)
     """
-    try:
-        grammar, parser = api_helper.parsear_gramatica(request.grammar)
-        
-        if grammar is None:
-            raise HTTPException(status_code=400, detail="Error al parsear gramática")
-        
-        return {
-            "success": True,
-            "data": api_helper.generar_graficos_base64(parser)
-        }
+    return {
+        "success": True,
+        "data": await _graficos(request.grammar, request.mode, request.graph_format)
+    }
+
+
+@app.post("/parse/graphs/dot")
+async def parse_graphs_dot(request: GrammarRequest):
+    """
+    Parsea una gramática y retorna el código DOT de los grafos del autómata
+    ({"afd": ..., "afn": ...}) sin renderizarlos: el frontend los dibuja.
     
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
+    Returns:
+        JSON con el código DOT de cada variante
+    """
+    return await _vista(request, "graphs/dot")
+
+
+@app.post("/parse/graphs/json")
+async def parse_graphs_json(request: GrammarRequest):
+    """
+    Parsea una gramática y retorna los grafos del autómata como nodos y aristas
+    ({"afd": {"nodes", "edges"}, "afn": {"nodes", "edges"}}), sin Graphviz.
+    
+    Returns:
+        JSON con los nodos y aristas de cada variante
+    """
+    return await _vista(request, "graphs/json")
+
+
+@app.post("/parse/graphs/dot/stream")
+async def parse_graphs_dot_stream(request: GraphStreamRequest):
+    """
+    Emite el código DOT de una variante del autómata en bloques de líneas.
+    
+    Returns:
+        StreamingResponse con media type text/vnd.graphviz
+    """
+    _, parser = await _compilar(request.grammar, request.mode)
+    return StreamingResponse(
+        api_helper.grafo_dot_stream(parser, request.variant),
+        media_type="text/vnd.graphviz"
+    )
+
+
+@app.post("/parse/graphs/json/stream")
+async def parse_graphs_json_stream(request: GraphStreamRequest):
+    """
+    Emite el grafo de una variante del autómata como NDJSON: una línea
+    {"type": "graph", ...} y después una por nodo y una por arista.
+    
+    Returns:
+        StreamingResponse con media type application/x-ndjson
+    """
+    _, parser = await _compilar(request.grammar, request.mode)
+    return StreamingResponse(
+        api_helper.grafo_ndjson(parser, request.variant),
+        media_type="application/x-ndjson"
+    )
+
+
+def _parsear_stream(grammar, parser, request):
+    """Respuesta NDJSON con los pasos del parsing de la cadena del request."""
+    # Starlette recorre el generador en su pool de hilos
+    return StreamingResponse(
+        api_helper.parsear_cadena_ndjson(
+            grammar, parser, request.input_string,
+            comprimida=request.compressed, traza=request.trace
+        ),
+        media_type="application/x-ndjson"
+    )
 
 
 @app.post("/parse/string")
-def parse_string(request: ParseStringRequest):
+async def parse_string(request: ParseStringRequest):
     """
     Parsea una cadena de entrada usando la gramática proporcionada.
     Retorna el proceso paso a paso del parsing.
@@ -314,30 +535,227 @@ def parse_string(request: ParseStringRequest):
             "input_string": "c c d d"
         }
     """
-    try:
-        # Parsear la gramática
-        grammar, parser = api_helper.parsear_gramatica(request.grammar)
-        
-        if grammar is None:
-            raise HTTPException(status_code=400, detail="Error al parsear gramática")
-        
-        # Parsear la cadena
-        resultado = api_helper.parsear_cadena(grammar, parser, request.input_string)
-        
-        if not resultado["success"] and resultado["error"]:
-            # Si hay error de sintaxis, retornar con éxito pero indicando rechazo
-            return {
-                "success": True,
-                "data": resultado
-            }
-        
-        return {
-            "success": True,
-            "data": resultado
+    # Un error de sintaxis también es una respuesta exitosa: data indica el rechazo
+    _, parser = await _compilar(request.grammar, request.mode)
+    return await _responder_con_parser(
+        api_helper.parsear_cadena,
+        request.grammar, request.mode, parser, request.input_string,
+        request.compressed, request.trace
+    )
+
+
+@app.post("/parse/string/stream")
+async def parse_string_stream(request: ParseStringRequest):
+    """
+    Parsea una cadena y emite los pasos como JSON delimitado por líneas (NDJSON)
+    a medida que se producen, sin construir la traza completa en memoria.
+    
+    Cada línea es {"type": "step", ...}; la última es {"type": "result", ...}
+    con accepted, error y summary.
+    
+    Args:
+        request: ParseStringRequest con la gramática, la cadena y el nivel de traza
+    
+    Returns:
+        StreamingResponse con media type application/x-ndjson
+    """
+    grammar, parser = await _compilar(request.grammar, request.mode)
+    return _parsear_stream(grammar, parser, request)
+
+
+@app.post("/parse/strings")
+async def parse_strings(request: BatchParseRequest):
+    """
+    Parsea un lote de cadenas con la misma gramática (el parser se construye una vez).
+    Los lotes grandes se reparten entre varios procesos.
+    
+    Args:
+        request: BatchParseRequest con la gramática y la lista de cadenas
+    
+    Returns:
+        JSON con el resultado de cada cadena y un resumen del lote
+    
+    Example:
+        POST /parse/strings
+        {
+            "grammar": "S -> C C\nC -> c C\nC -> d",
+            "input_strings": ["c c d d", "d d", "c c"]
         }
+    """
+    return {
+        "success": True,
+        "data": await _esperar(api_helper.parsear_cadenas_async(
+            request.grammar, request.input_strings, mode=request.mode,
+            comprimida=request.compressed, traza=request.trace
+        ))
+    }
+
+
+@app.post("/parse/recognize")
+async def recognize_string(request: RecognizeRequest):
+    """
+    Reconoce una cadena con las tablas compiladas del parser.
+    Retorna solo si se acepta, la posición del error y (opcionalmente) el
+    árbol de derivación, sin el proceso paso a paso.
     
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
+    Example:
+        POST /parse/recognize
+        {
+            "grammar": "S -> C C\nC -> c C\nC -> d",
+            "input_string": "c c d d",
+            "build_tree": true
+        }
+    """
+    _, parser = await _compilar(request.grammar, request.mode)
+    return await _responder_con_parser(
+        api_helper.reconocer_con_parser,
+        request.grammar, request.mode, parser, request.input_string,
+        request.build_tree, request.compressed
+    )
+
+
+# ============================================================================
+# Registro de gramáticas (/grammars)
+# ============================================================================
+
+def _info_gramatica(grammar_id, entrada):
+    """Descripción de una gramática registrada y de sus vistas."""
+    grammar, parser = entrada["grammar"], entrada["parser"]
+    return {
+        "id": grammar_id,
+        "mode": entrada["mode"],
+        "num_productions": len(grammar.productions),
+        "num_states": parser.tables.num_states,
+        "views": [f"/grammars/{grammar_id}/{vista}" for vista in api_helper.VISTAS],
+    }
+
+
+def _etag_coincide(if_none_match, etag):
+    """Indica si el header If-None-Match incluye el ETag (o es "*")."""
+    if not if_none_match:
+        return False
+    candidatos = [valor.strip() for valor in if_none_match.split(",")]
+    return "*" in candidatos or any(
+        candidato.removeprefix("W/") == etag for candidato in candidatos
+    )
+
+
+@app.post("/grammars")
+async def register_grammar(request: GrammarRequest):
+    """
+    Compila una gramática y la registra. Retorna su id, que depende solo del
+    contenido (texto normalizado y modo): registrar la misma gramática otra
+    vez retorna el mismo id sin reconstruirla.
+    
+    Example:
+        POST /grammars
+        {
+            "grammar": "S -> C C\nC -> c C\nC -> d",
+            "mode": "lalr"
+        }
+    """
+    grammar_id = await _esperar(api_helper.registrar_gramatica_async(request.grammar, mode=request.mode))
+    
+    if grammar_id is None:
+        raise HTTPException(status_code=400, detail="Error al parsear gramática")
+    
+    return {
+        "success": True,
+        "data": _info_gramatica(grammar_id, _registrada(grammar_id))
+    }
+
+
+@app.get("/grammars/{grammar_id}")
+async def get_grammar(grammar_id: str):
+    """Retorna la descripción de una gramática registrada."""
+    return {
+        "success": True,
+        "data": _info_gramatica(grammar_id, _registrada(grammar_id))
+    }
+
+
+@app.delete("/grammars/{grammar_id}")
+async def delete_grammar(grammar_id: str):
+    """Elimina una gramática del registro."""
+    if not api_helper.eliminar_gramatica_registrada(grammar_id):
+        raise HTTPException(status_code=404, detail=f"Gramática '{grammar_id}' no registrada")
+    return {"success": True, "data": {"id": grammar_id}}
+
+
+@app.get("/grammars/{grammar_id}/{vista:path}")
+async def get_grammar_view(grammar_id: str, vista: str, request: Request):
+    """
+    Retorna una vista (productions, symbols, first-follow, automaton, table,
+    table/compressed, closure, graphs, graphs/svg, graphs/dot o graphs/json)
+    de una gramática registrada.
+    
+    La respuesta lleva un ETag: como el id depende del contenido, la vista solo
+    cambia con la versión del paquete. Con If-None-Match se responde 304.
+    """
+    if vista not in api_helper.VISTAS:
+        raise HTTPException(status_code=404, detail=f"Vista desconocida: {vista}")
+    
+    entrada = _registrada(grammar_id)
+    etag = f'"{grammar_id}-{vista.replace("/", "-")}-{lr1_version}"'
+    
+    if _etag_coincide(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    
+    if vista in ("graphs", "graphs/svg"):
+        respuesta = {
+            "success": True,
+            "data": await _graficos(
+                entrada["text"], entrada["mode"], "svg" if vista == "graphs/svg" else "png",
+                parser=entrada["parser"]
+            )
+        }
+    else:
+        respuesta = await _responder_con_parser(
+            api_helper.calcular_vista, entrada["text"], entrada["mode"], entrada["parser"], vista
+        )
+    return JSONResponse(jsonable_encoder(respuesta), headers={"ETag": etag})
+
+
+@app.post("/grammars/{grammar_id}/parse")
+async def parse_with_grammar(grammar_id: str, request: GrammarParseRequest):
+    """Parsea una cadena con una gramática registrada (como /parse/string)."""
+    entrada = _registrada(grammar_id)
+    return await _responder_con_parser(
+        api_helper.parsear_cadena,
+        entrada["text"], entrada["mode"], entrada["parser"], request.input_string,
+        request.compressed, request.trace
+    )
+
+
+@app.post("/grammars/{grammar_id}/parse/stream")
+async def parse_stream_with_grammar(grammar_id: str, request: GrammarParseRequest):
+    """Parsea una cadena con una gramática registrada emitiendo NDJSON (como /parse/string/stream)."""
+    entrada = _registrada(grammar_id)
+    return _parsear_stream(entrada["grammar"], entrada["parser"], request)
+
+
+@app.post("/grammars/{grammar_id}/strings")
+async def parse_strings_with_grammar(grammar_id: str, request: GrammarBatchRequest):
+    """Parsea un lote de cadenas con una gramática registrada (como /parse/strings)."""
+    entrada = _registrada(grammar_id)
+    return {
+        "success": True,
+        "data": await _esperar(api_helper.parsear_cadenas_con_parser_async(
+            entrada["text"], entrada["mode"], entrada["parser"], request.input_strings,
+            comprimida=request.compressed, traza=request.trace
+        ))
+    }
+
+
+@app.post("/grammars/{grammar_id}/recognize")
+async def recognize_with_grammar(grammar_id: str, request: GrammarRecognizeRequest):
+    """Reconoce una cadena con una gramática registrada (como /parse/recognize)."""
+    entrada = _registrada(grammar_id)
+    return await _responder_con_parser(
+        api_helper.reconocer_con_parser,
+        entrada["text"], entrada["mode"], entrada["parser"], request.input_string,
+        request.build_tree, request.compressed
+    )
 
 
 # ============================================================================
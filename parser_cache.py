@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+"""
+Parser Cache - Caché LRU de parsers LR(1) ya construidos
+Comparte los pares (Grammar, LR1Parser) entre todos los endpoints del backend
+"""
+
+import asyncio
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import CancelledError, Future
+
+
+def normalizar_gramatica(texto):
+    """
+    Normaliza el texto de una gramática para que dos textos equivalentes
+    (espacios extra, líneas vacías o comentarios) compartan la misma entrada.
+    """
+    lineas = []
+    for linea in texto.strip().split('\n'):
+        linea = " ".join(linea.split())
+        if not linea or linea.startswith('#'):
+            continue
+        lineas.append(linea)
+    return "\n".join(lineas)
+
+
+def huella_gramatica(texto, *extra):
+    """Calcula la huella (SHA-256) del texto normalizado de una gramática."""
+    contenido = normalizar_gramatica(texto)
+    for valor in extra:
+        contenido += f"\n#{valor}"
+    return hashlib.sha256(contenido.encode("utf-8")).hexdigest()
+
+
+class ParserCache:
+    """
+    Caché LRU acotada por número de entradas y por memoria estimada.
+
+    Los objetos guardados se congelan antes de insertarse, así que pueden
+    compartirse entre peticiones concurrentes sin copiarlos.
+
+    Las construcciones son "single-flight": si varias peticiones piden a la vez
+    una gramática que no está en caché, solo la primera la construye y las demás
+    esperan su resultado (`coalesced` cuenta las que se ahorraron).
+
+    Las construcciones que fallan con una excepción de `failure_types` (p. ej.
+    BuildLimitExceeded) se recuerdan durante `failure_ttl` segundos: mientras
+    tanto, pedir la misma gramática relanza el error guardado sin volver a
+    construirla. `failure_scope` se añade a la clave de esos fallos (p. ej.
+    los límites de construcción), así que un fallo con unos límites no se
+    reutiliza con otros.
+    """
+
+    def __init__(self, max_entries=128, max_bytes=256 * 1024 * 1024,
+                 failure_ttl=0, failure_types=(), failure_scope="", clock=time.monotonic):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.failure_ttl = failure_ttl
+        self.failure_types = tuple(failure_types)
+        self.failure_scope = failure_scope
+        self._clock = clock
+        self._entries = OrderedDict()  # huella -> (valor, tamaño)
+        self._in_flight = {}  # huella -> Future de la construcción en curso
+        self._failures = OrderedDict()  # (huella, ámbito) -> (expira, excepción)
+        self._lock = threading.Lock()
+        self._total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.coalesced = 0
+        self.failure_hits = 0
+
+    def get(self, key):
+        """Retorna el valor cacheado para la huella (o None) y lo marca como reciente."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, size):
+        """Inserta un valor y expulsa las entradas menos usadas si se superan los límites."""
+        if size > self.max_bytes or self.max_entries <= 0:
+            # No cabe en la caché: se usa sin guardarlo
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._total_bytes -= previous[1]
+            self._entries[key] = (value, size)
+            self._total_bytes += size
+            while (
+                len(self._entries) > self.max_entries
+                or self._total_bytes > self.max_bytes
+            ):
+                _, (_, old_size) = self._entries.popitem(last=False)
+                self._total_bytes -= old_size
+                self.evictions += 1
+
+    def _join(self, key):
+        """
+        Busca la huella en la caché o en las construcciones en curso.
+
+        Returns:
+            Tupla (valor, futuro, es_lider): el valor cacheado si lo hay; si no,
+            el futuro de la construcción y si le toca a este llamador hacerla
+
+        Raises:
+            El error guardado si la construcción falló hace menos de failure_ttl
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0], None, False
+            failure = self._failures.get((key, self.failure_scope))
+            if failure is not None:
+                if failure[0] > self._clock():
+                    self.failure_hits += 1
+                    # Una copia por petición: cada una lleva su propio traceback
+                    raise copy.copy(failure[1])
+                del self._failures[(key, self.failure_scope)]
+            futuro = self._in_flight.get(key)
+            if futuro is not None:
+                self.coalesced += 1
+                return None, futuro, False
+            self.misses += 1
+            futuro = self._in_flight[key] = Future()
+            return None, futuro, True
+
+    def _land(self, key, futuro, resultado=None, error=None):
+        # Se retira de las construcciones en curso antes de despertar a los que
+        # esperan; un fallo recordable queda guardado antes de retirarla
+        with self._lock:
+            if error is not None and self.failure_ttl > 0 and isinstance(error, self.failure_types):
+                self._remember_failure(key, error)
+            self._in_flight.pop(key, None)
+        if error is None:
+            futuro.set_result(resultado)
+        elif isinstance(error, Exception):
+            futuro.set_exception(error)
+        else:
+            # Construcción abandonada (p. ej. petición cancelada): los demás reintentan
+            futuro.cancel()
+
+    def _remember_failure(self, key, error):
+        # Se llama con el lock tomado; los fallos caducados o más antiguos
+        # se descartan para no superar max_entries
+        now = self._clock()
+        failure_key = (key, self.failure_scope)
+        self._failures.pop(failure_key, None)
+        self._failures[failure_key] = (now + self.failure_ttl, error)
+        while self._failures:
+            expires, _ = next(iter(self._failures.values()))
+            if expires > now and len(self._failures) <= max(self.max_entries, 1):
+                break
+            self._failures.popitem(last=False)
+
+    def get_or_build(self, texto, constructor, *extra):
+        """
+        Retorna el par (grammar, parser) para el texto dado, construyéndolo
+        con `constructor(texto, *extra)` solo si no está en caché ni se está
+        construyendo ya en otro hilo (en ese caso espera su resultado).
+
+        Args:
+            texto: Texto de la gramática
+            constructor: Función que retorna (grammar, parser) o (None, None)
+            *extra: Argumentos adicionales del constructor (p. ej. el modo),
+                que también forman parte de la clave
+
+        Returns:
+            Tupla (grammar, parser), o (None, None) si la construcción falla
+
+        Raises:
+            La excepción del constructor (o la recordada, ver failure_ttl)
+        """
+        key = huella_gramatica(texto, *extra)
+        while True:
+            cached, futuro, lider = self._join(key)
+            if cached is not None:
+                return cached
+            if lider:
+                break
+            try:
+                return futuro.result()
+            except CancelledError:
+                continue
+
+        try:
+            grammar, parser = constructor(texto, *extra)
+            resultado = self._store(key, grammar, parser)
+        except BaseException as e:
+            self._land(key, futuro, error=e)
+            raise
+        self._land(key, futuro, resultado)
+        return resultado
+
+    async def get_or_build_async(self, texto, constructor, *extra):
+        """
+        Igual que get_or_build, pero `constructor` es una corrutina (p. ej. una
+        que delega la construcción a un pool de procesos).
+        """
+        key = huella_gramatica(texto, *extra)
+        while True:
+            cached, futuro, lider = self._join(key)
+            if cached is not None:
+                return cached
+            if lider:
+                break
+            try:
+                # shield: cancelar esta petición no cancela la construcción compartida
+                return await asyncio.shield(asyncio.wrap_future(futuro))
+            except asyncio.CancelledError:
+                if not futuro.cancelled():
+                    raise
+
+        try:
+            grammar, parser = await constructor(texto, *extra)
+            resultado = self._store(key, grammar, parser)
+        except BaseException as e:
+            self._land(key, futuro, error=e)
+            raise
+        self._land(key, futuro, resultado)
+        return resultado
+
+    def _store(self, key, grammar, parser):
+        """Congela y guarda un par recién construido; retorna (grammar, parser)."""
+        if grammar is None or parser is None:
+            return None, None
+
+        parser.freeze()
+        self.put(key, (grammar, parser), parser.estimate_memory())
+        return grammar, parser
+
+    def clear(self):
+        """Vacía la caché (los contadores se conservan)."""
+        with self._lock:
+            self._entries.clear()
+            self._failures.clear()
+            self._total_bytes = 0
+
+    def stats(self):
+        """Retorna las estadísticas de uso de la caché."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._in_flight),
+                "failures": len(self._failures),
+                "failure_hits": self.failure_hits,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+"""
+Process Pool - Pool de procesos de trabajo con cancelación por tarea
+Ejecuta la construcción y el parsing fuera del proceso del servidor
+"""
+
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+
+def _bucle_trabajador(conexion):
+    """Bucle de un proceso de trabajo: recibe (función, args) y responde el resultado."""
+    while True:
+        try:
+            funcion, args = conexion.recv()
+        except (EOFError, OSError):
+            return
+        try:
+            respuesta = ("ok", funcion(*args))
+        except Exception as e:
+            respuesta = ("error", e)
+        try:
+            conexion.send(respuesta)
+        except Exception as e:
+            # Resultado (o excepción) que no se puede serializar
+            conexion.send(("error", RuntimeError(f"Resultado no serializable: {e!r}")))
+
+
+class _Worker:
+    """Un proceso de trabajo y su extremo de la tubería."""
+
+    def __init__(self, context):
+        self.connection, hijo = context.Pipe()
+        self.process = context.Process(target=_bucle_trabajador, args=(hijo,), daemon=True)
+        self.process.start()
+        hijo.close()
+        self.cancelled = False
+
+    def stop(self):
+        self.process.terminate()
+        self.process.join(5)
+        self.connection.close()
+
+
+class ProcessPool:
+    """
+    Pool de `max_workers` procesos en el que cada tarea se cancela por separado.
+
+    ProcessPoolExecutor no permite interrumpir una tarea en curso, y terminar
+    uno de sus procesos rompe el pool entero. Aquí cada proceso atiende una
+    tarea a la vez por su propia tubería (un hilo del pool espera su
+    respuesta): cancelar una tarea en curso termina solo el proceso que la
+    ejecuta, que se sustituye en la siguiente tarea; las demás siguen.
+
+    Las funciones y sus argumentos se envían con pickle (funciones de nivel de
+    módulo, como en ProcessPoolExecutor).
+    """
+
+    def __init__(self, max_workers, mp_context=None):
+        self.max_workers = max_workers
+        # "spawn": los procesos no heredan los hilos ni el socket del servidor
+        self._context = mp_context or multiprocessing.get_context("spawn")
+        self._threads = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="lr1-pool")
+        self._idle = queue.SimpleQueue()  # procesos libres
+        self._workers = set()
+        self._running = {}  # Future -> _Worker que ejecuta la tarea
+        self._lock = threading.Lock()
+        self._closed = False
+        self.tasks = 0
+        self.cancelled = 0
+        self.crashes = 0
+
+    def submit(self, funcion, *args):
+        """Encola `funcion(*args)` y retorna un Future con su resultado."""
+        futuro = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("El pool de procesos está cerrado")
+            self.tasks += 1
+        self._threads.submit(self._run, futuro, funcion, args)
+        return futuro
+
+    def map(self, funcion, *iterables):
+        """Como Executor.map: los resultados en el orden de los argumentos."""
+        futuros = [self.submit(funcion, *args) for args in zip(*iterables)]
+        return [futuro.result() for futuro in futuros]
+
+    def cancel(self, futuro):
+        """
+        Cancela una tarea: si espera turno ya no se ejecuta; si está en curso,
+        se termina el proceso que la ejecuta (y solo ese).
+
+        Returns:
+            True si la tarea no llegará a completarse
+        """
+        if futuro.cancel():
+            return True
+        with self._lock:
+            worker = self._running.get(futuro)
+            if worker is None:
+                return False  # ya terminó
+            worker.cancelled = True
+            self.cancelled += 1
+        worker.process.terminate()
+        return True
+
+    def _acquire(self):
+        """Un proceso libre; se lanza uno nuevo si todos los existentes están ocupados."""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        worker = _Worker(self._context)
+        with self._lock:
+            self._workers.add(worker)
+        return worker
+
+    def _discard(self, worker):
+        with self._lock:
+            self._workers.discard(worker)
+        worker.stop()
+
+    def _run(self, futuro, funcion, args):
+        """Ejecuta una tarea en un proceso libre (en un hilo del pool)."""
+        if not futuro.set_running_or_notify_cancel():
+            return
+        if self._closed:
+            futuro.set_exception(CancelledError())
+            return
+        try:
+            worker = self._acquire()
+        except Exception as e:
+            futuro.set_exception(e)
+            return
+
+        with self._lock:
+            self._running[futuro] = worker
+        try:
+            worker.connection.send((funcion, args))
+            estado, valor = worker.connection.recv()
+        except (EOFError, OSError):
+            # El proceso terminó: cancelado por cancel() o caído
+            estado, valor = None, None
+        except Exception as e:
+            # La tarea o su resultado no se pudo serializar: el proceso sigue sano
+            estado, valor = "error", e
+        with self._lock:
+            del self._running[futuro]
+            cancelada = worker.cancelled
+            if estado is None and not cancelada:
+                self.crashes += 1
+
+        if estado is None or cancelada or self._closed:
+            self._discard(worker)
+        else:
+            self._idle.put(worker)
+
+        if estado == "ok":
+            futuro.set_result(valor)
+        elif estado == "error":
+            futuro.set_exception(valor)
+        elif cancelada:
+            futuro.set_exception(CancelledError())
+        else:
+            futuro.set_exception(BrokenProcessPool("El proceso de trabajo terminó durante la tarea"))
+
+    def shutdown(self):
+        """Termina todos los procesos; las tareas en curso fallan con CancelledError."""
+        with self._lock:
+            self._closed = True
+            workers = list(self._workers)
+            for worker in self._running.values():
+                worker.cancelled = True
+        for worker in workers:
+            worker.process.terminate()
+        self._threads.shutdown(wait=True)
+        for worker in workers:
+            self._discard(worker)
+
+    def stats(self):
+        """Retorna el estado y los contadores del pool."""
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "processes": len(self._workers),
+                "running": len(self._running),
+                "tasks": self.tasks,
+                "cancelled": self.cancelled,
+                "crashes": self.crashes,
+            }